@@ -1,11 +1,31 @@
+import pandas as pd # type: ignore
 import streamlit as st # type: ignore
 
-# Configurar la página principal
-st.set_page_config(page_title="Actividades comerciales Octubre", layout="centered")
+from pac.datos import leer_cuarentena
+from pac.instrumentacion import pagina
+from pac.precalentamiento import mostrar_estado, precalentar
 
-st.title("Actividades comerciales Octubre")
-st.image("PAC_Oct/assets/PAC_Oct.png")
+# El cubo y los resultados se comparten entre sesiones y cada página recibe una
+# vista sin copiar los datos: con Copy-on-Write cualquier escritura sobre una
+# vista copia primero la columna afectada, así que ninguna página puede alterar
+# los datos compartidos. Cada página lo activa también, porque Streamlit sólo
+# ejecuta el script de la página que se abre
+pd.set_option("mode.copy_on_write", True)
 
+# Configurar la página principal
+st.set_page_config(page_title="Actividades comerciales Octubre", layout="centered")
 
+# Medir las fases y perfilar la página, si el entorno lo habilita (ver pac.instrumentacion)
+with pagina(__file__):
+    # Cargar datos y calcular las actividades en segundo plano (una vez por proceso)
+    precalentamiento = precalentar()
 
+    st.title("Actividades comerciales Octubre")
+    st.image("PAC_Oct/assets/PAC_Oct.png")
+    mostrar_estado(precalentamiento)
 
+    # Valores del libro que no eran números y se tomaron como 0 en la última carga
+    cuarentena = leer_cuarentena()
+    if len(cuarentena):
+        with st.expander(f"Valores no numéricos del libro tomados como 0: {len(cuarentena)}"):
+            st.dataframe(cuarentena, hide_index=True, use_container_width=True)
@@ -0,0 +1 @@
+"""Mediciones de rendimiento de las páginas con datos sintéticos."""
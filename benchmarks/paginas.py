@@ -0,0 +1,281 @@
+"""Benchmark de extremo a extremo de las páginas de actividades.
+
+Genera ventas sintéticas (``pac.sintetico``) de tamaño creciente y ejecuta cada
+página sin navegador con ``AppTest`` de Streamlit, en un proceso aparte por
+página y tamaño, así la memoria y las cachés empiezan de cero. De cada corrida
+se guarda el tiempo exclusivo de cada fase, tomado del registro JSONL de
+``pac.instrumentacion`` (las mismas fases que muestra el panel ``?debug=1``,
+más ``sin_medir``, lo que no cubre ninguna), el pico de memoria y el tiempo de
+una segunda corrida con las cachés llenas.
+
+Los resultados se escriben en JSON. Con ``--base`` se comparan con un JSON
+anterior, y para cada página se estima el exponente de crecimiento entre los
+dos tamaños mayores para marcar crecimientos superlineales. Se ejecuta desde la
+raíz del repositorio:
+
+    python -m benchmarks.paginas --filas 100000 1000000 --salida bench.json
+    python -m benchmarks.paginas --filas 100000 1000000 --base bench.json
+"""
+import argparse
+import glob
+import json
+import math
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from pac.memoria import rss_mb
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Crecimiento de tiempo o memoria respecto de las filas a partir del cual se avisa
+EXPONENTE_MAXIMO = 1.15
+
+# Aumento relativo respecto de la base a partir del cual se avisa, y cambio
+# absoluto mínimo para no avisar por el ruido de las medidas pequeñas
+TOLERANCIA = 0.25
+MINIMO_ABSOLUTO = {"total_s": 0.1, "caliente_s": 0.1, "pico_mb": 10.0}
+
+
+class _Pico:
+    """Pico de memoria residente del proceso, con un hilo que la muestrea."""
+
+    def __init__(self, intervalo=0.005):
+        self.pico = rss_mb()
+        self._intervalo = intervalo
+        self._activo = True
+        threading.Thread(target=self._muestrear, daemon=True).start()
+
+    def _muestrear(self):
+        while self._activo:
+            self.pico = max(self.pico, rss_mb())
+            time.sleep(self._intervalo)
+
+    def detener(self):
+        self._activo = False
+        self.pico = max(self.pico, rss_mb())
+        return self.pico
+
+
+def _leer_registro(ruta):
+    # Líneas del registro JSONL de pac.instrumentacion
+    if not os.path.exists(ruta):
+        return []
+    with open(ruta, encoding="utf-8") as archivo:
+        return [json.loads(linea) for linea in archivo if linea.strip()]
+
+
+def fases_exclusivas(registros):
+    """Segundos de cada fase sin los de las fases anidadas, sumados sobre ``registros``."""
+    tiempos = {}
+    for registro in registros:
+        abiertas = []
+        # Las fases están en orden de inicio; la de nivel n está dentro de la última de nivel n - 1
+        for entrada in registro["fases"]:
+            del abiertas[entrada["nivel"]:]
+            duracion = entrada.get("duracion") or 0.0
+            tiempos[entrada["fase"]] = tiempos.get(entrada["fase"], 0.0) + duracion
+            if abiertas:
+                tiempos[abiertas[-1]] -= duracion
+            abiertas.append(entrada["fase"])
+    return tiempos
+
+
+def medir(pagina, timeout):
+    """Ejecuta ``pagina`` dos veces con AppTest y devuelve las métricas de la primera.
+
+    Las fases salen del registro de ``pac.instrumentacion``: el proceso tiene que
+    correr con ``PAC_INSTRUMENTACION=1`` y ``PAC_REGISTRO_FASES`` (lo hace ``_correr``).
+    """
+    # Importar antes de medir para no contar la importación de pandas y Streamlit como fase
+    import pac.campanas  # noqa: F401
+    import pac.resultados  # noqa: F401
+    from pac import instrumentacion
+    from streamlit.testing.v1 import AppTest # type: ignore
+
+    if not instrumentacion.ACTIVA or not instrumentacion.RUTA_REGISTRO:
+        raise RuntimeError("Para medir hacen falta PAC_INSTRUMENTACION=1 y PAC_REGISTRO_FASES")
+    previos = len(_leer_registro(instrumentacion.RUTA_REGISTRO))
+
+    rss_inicial = rss_mb()
+    pico = _Pico()
+    inicio = time.perf_counter()
+    app = AppTest.from_file(os.path.join(RAIZ, pagina), default_timeout=timeout)
+    app.run()
+    total = time.perf_counter() - inicio
+    pico_total = pico.detener()
+    errores = [str(e.value) for e in app.exception] + [str(e.value) for e in app.error]
+    tiempos = fases_exclusivas(_leer_registro(instrumentacion.RUTA_REGISTRO)[previos:])
+    # Lo que no cubre ninguna fase: AppTest, la ejecución del script y lo no instrumentado
+    tiempos["sin_medir"] = max(total - sum(tiempos.values()), 0.0)
+
+    inicio = time.perf_counter()
+    app.run()
+    caliente = time.perf_counter() - inicio
+
+    return {
+        "total_s": total,
+        "caliente_s": caliente,
+        "fases_s": tiempos,
+        "pico_mb": pico_total - rss_inicial,
+        "errores": errores,
+    }
+
+
+def paginas(patron=None):
+    rutas = sorted(os.path.relpath(ruta, RAIZ) for ruta in glob.glob(os.path.join(RAIZ, "pages", "*.py")))
+    return [ruta for ruta in rutas if patron is None or patron.lower() in ruta.lower()]
+
+
+def _dataset(trabajo, filas, semilla):
+    from pac.sintetico import VERSION_GENERADOR, escribir
+    # Con otra versión del generador las filas cambian: no reutilizar ese dataset
+    carpeta = os.path.join(trabajo, f"generador_{VERSION_GENERADOR}_filas_{filas}_semilla_{semilla}")
+    ruta = os.path.join(carpeta, "ventas.parquet")
+    if not os.path.exists(ruta):
+        os.makedirs(carpeta, exist_ok=True)
+        print(f"Generando {filas} filas en {ruta}", file=sys.stderr)
+        escribir(ruta + ".tmp.parquet", filas, semilla=semilla)
+        os.replace(ruta + ".tmp.parquet", ruta)
+    return ruta
+
+
+def _correr(pagina, ruta, timeout):
+    # Proceso nuevo y caché del dataset vacía: la corrida mide la carga en frío
+    shutil.rmtree(os.path.join(os.path.dirname(ruta), ".cache"), ignore_errors=True)
+    with tempfile.TemporaryDirectory() as temporal:
+        # Las fases las anota la instrumentación de las páginas en un registro propio de la corrida
+        entorno = dict(os.environ, PAC_RUTA_DATOS=ruta, PAC_INSTRUMENTACION="1",
+                       PAC_REGISTRO_FASES=os.path.join(temporal, "fases.jsonl"))
+        proceso = subprocess.run(
+            [sys.executable, "-m", "benchmarks.paginas", "--medir", pagina, "--timeout", str(timeout)],
+            cwd=RAIZ, env=entorno, capture_output=True, text=True,
+        )
+    if proceso.returncode != 0:
+        return {"errores": [proceso.stderr.strip().splitlines()[-1] if proceso.stderr.strip() else "sin salida"]}
+    return json.loads(proceso.stdout.strip().splitlines()[-1])
+
+
+def exponente(tamanos, valores):
+    """Exponente de crecimiento entre los dos tamaños mayores (1 = lineal), o None."""
+    puntos = sorted((n, v) for n, v in zip(tamanos, valores) if v is not None and v > 0)
+    if len(puntos) < 2 or puntos[-1][0] == puntos[-2][0]:
+        return None
+    (n1, v1), (n2, v2) = puntos[-2], puntos[-1]
+    return math.log(v2 / v1) / math.log(n2 / n1)
+
+
+def escalado(resultados, exponente_maximo=EXPONENTE_MAXIMO):
+    informe = {}
+    for pagina, por_tamano in resultados.items():
+        tamanos = sorted(int(n) for n, medida in por_tamano.items() if not medida.get("errores"))
+        medidas = [por_tamano[str(n)] for n in tamanos]
+        tiempo = exponente(tamanos, [m["total_s"] for m in medidas])
+        memoria = exponente(tamanos, [m["pico_mb"] for m in medidas])
+        informe[pagina] = {
+            "exponente_tiempo": tiempo,
+            "exponente_memoria": memoria,
+            "superlineal": any(e is not None and e > exponente_maximo for e in (tiempo, memoria)),
+        }
+    return informe
+
+
+def comparar(resultados, base, tolerancia=TOLERANCIA):
+    """Cambio relativo de tiempo y memoria respecto de ``base`` por página y tamaño."""
+    comparacion = {}
+    for pagina, por_tamano in resultados.items():
+        for filas, medida in por_tamano.items():
+            anterior = base.get("paginas", {}).get(pagina, {}).get(filas)
+            if not anterior or anterior.get("errores") or medida.get("errores"):
+                continue
+            cambios = {
+                metrica: medida[metrica] / anterior[metrica] - 1
+                for metrica in MINIMO_ABSOLUTO if anterior.get(metrica, 0) > 0
+            }
+            comparacion.setdefault(pagina, {})[filas] = {
+                "cambios": cambios,
+                "regresion": any(
+                    cambio > tolerancia and medida[metrica] - anterior[metrica] > MINIMO_ABSOLUTO[metrica]
+                    for metrica, cambio in cambios.items()
+                ),
+            }
+    return comparacion
+
+
+def _imprimir(informe):
+    for pagina, por_tamano in informe["paginas"].items():
+        escala = informe["escalado"][pagina]
+        aviso = "  ** crecimiento superlineal **" if escala["superlineal"] else ""
+        print(f"{pagina}{aviso}")
+        for filas, medida in sorted(por_tamano.items(), key=lambda par: int(par[0])):
+            if medida.get("errores"):
+                print(f"  {int(filas):>12,} filas  ERROR: {medida['errores'][0]}")
+                continue
+            fases = "  ".join(f"{nombre} {segundos:.2f}" for nombre, segundos in medida["fases_s"].items())
+            cambio = informe.get("comparacion", {}).get(pagina, {}).get(filas)
+            regresion = "  ** regresión **" if cambio and cambio["regresion"] else ""
+            print(f"  {int(filas):>12,} filas  {medida['total_s']:7.2f} s  (caliente {medida['caliente_s']:.2f} s)"
+                  f"  {medida['pico_mb']:7.1f} MB  [{fases}]{regresion}")
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Mide las páginas de actividades con datos sintéticos.")
+    parser.add_argument("--filas", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--paginas", help="sólo las páginas cuyo nombre contiene este texto")
+    parser.add_argument("--trabajo", default=os.path.join(RAIZ, ".benchmarks"), help="carpeta para los datasets generados")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--salida", help="archivo JSON para los resultados")
+    parser.add_argument("--base", help="resultados JSON anteriores para comparar")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA)
+    parser.add_argument("--exponente-maximo", type=float, default=EXPONENTE_MAXIMO)
+    parser.add_argument("--timeout", type=float, default=600)
+    parser.add_argument("--medir", help=argparse.SUPPRESS)
+    args = parser.parse_args(argumentos)
+
+    if args.medir:
+        # Proceso hijo: una página con el dataset de PAC_RUTA_DATOS
+        print(json.dumps(medir(args.medir, args.timeout)))
+        return 0
+
+    from pac.sintetico import VERSION_GENERADOR
+    seleccion = paginas(args.paginas)
+    if not seleccion:
+        parser.error("ninguna página coincide")
+    resultados = {pagina: {} for pagina in seleccion}
+    for filas in sorted(args.filas):
+        ruta = _dataset(args.trabajo, filas, args.semilla)
+        for pagina in seleccion:
+            print(f"Midiendo {pagina} con {filas} filas", file=sys.stderr)
+            resultados[pagina][str(filas)] = _correr(pagina, ruta, args.timeout)
+
+    informe = {
+        "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "semilla": args.semilla,
+        "generador": VERSION_GENERADOR,
+        "filas": sorted(args.filas),
+        "paginas": resultados,
+        "escalado": escalado(resultados, args.exponente_maximo),
+    }
+    if args.base:
+        with open(args.base, encoding="utf-8") as archivo:
+            informe["comparacion"] = comparar(resultados, json.load(archivo), args.tolerancia)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as archivo:
+            json.dump(informe, archivo, ensure_ascii=False, indent=2)
+    _imprimir(informe)
+
+    regresiones = any(escala["superlineal"] for escala in informe["escalado"].values()) or any(
+        cambio["regresion"] for por_tamano in informe.get("comparacion", {}).values() for cambio in por_tamano.values())
+    fallidas = any(medida.get("errores") for por_tamano in resultados.values() for medida in por_tamano.values())
+    return 1 if regresiones or fallidas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""Tabla de calendario para resolver actividades recurrentes.
+
+Cada día trae su día de la semana, semana y año ISO, mes y si es festivo en
+Colombia. Una regla como "viernes a domingo entre dos fechas, sin festivos" se
+resuelve con máscaras sobre esta tabla en lugar de escribir las fechas a mano.
+"""
+import functools
+import unicodedata
+
+import numpy as np # type: ignore
+import pandas as pd # type: ignore
+
+# Nombres de los días de la semana (lunes = 0, como en pandas)
+DIAS_SEMANA = ("lunes", "martes", "miercoles", "jueves", "viernes", "sabado", "domingo")
+
+# Festivos de fecha fija y festivos que se trasladan al lunes siguiente (Ley Emiliani)
+FESTIVOS_FIJOS = ((1, 1), (5, 1), (7, 20), (8, 7), (12, 8), (12, 25))
+FESTIVOS_TRASLADABLES = ((1, 6), (3, 19), (6, 29), (8, 15), (10, 12), (11, 1), (11, 11))
+
+# Festivos que dependen de la Pascua, en días desde el domingo de Pascua; los
+# de más de 40 días ya están corridos al lunes
+FESTIVOS_PASCUA = (-3, -2, 43, 64, 71)
+
+
+def _pascua(anio):
+    # Algoritmo anónimo gregoriano (Meeus/Jones/Butcher)
+    a, b, c = anio % 19, anio // 100, anio % 100
+    d, e = divmod(b, 4)
+    g = (8 * b + 13) // 25
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    mes, dia = divmod(h + l - 7 * m + 114, 31)
+    return pd.Timestamp(anio, mes, dia + 1)
+
+
+def festivos_colombia(anio):
+    """Festivos nacionales de Colombia en ``anio``."""
+    festivos = [pd.Timestamp(anio, mes, dia) for mes, dia in FESTIVOS_FIJOS]
+    for mes, dia in FESTIVOS_TRASLADABLES:
+        fecha = pd.Timestamp(anio, mes, dia)
+        festivos.append(fecha + pd.Timedelta(days=(7 - fecha.dayofweek) % 7))
+    pascua = _pascua(anio)
+    festivos.extend(pascua + pd.Timedelta(days=dias) for dias in FESTIVOS_PASCUA)
+    # Dos festivos pueden caer el mismo lunes (San Pedro y el Sagrado Corazón en 2025)
+    return pd.DatetimeIndex(sorted(set(festivos)))
+
+
+@functools.lru_cache(maxsize=8)
+def calendario(anio_inicio, anio_fin):
+    """Un día por fila entre el 1 de enero de ``anio_inicio`` y el 31 de diciembre de ``anio_fin``."""
+    dias = pd.date_range(pd.Timestamp(anio_inicio, 1, 1), pd.Timestamp(anio_fin, 12, 31), freq="D", name="Date")
+    iso = dias.isocalendar()
+    festivos = pd.DatetimeIndex(np.concatenate([festivos_colombia(anio) for anio in range(anio_inicio, anio_fin + 1)]))
+    return pd.DataFrame({
+        "dia_semana": dias.dayofweek.astype("int8"),
+        "semana_iso": iso["week"].to_numpy(dtype="int8"),
+        "anio_iso": iso["year"].to_numpy(dtype="int16"),
+        "mes": dias.month.astype("int8"),
+        "festivo": dias.isin(festivos),
+    }, index=dias)
+
+
+def _normalizar(nombre):
+    texto = unicodedata.normalize("NFKD", str(nombre).strip().lower())
+    return "".join(caracter for caracter in texto if not unicodedata.combining(caracter))
+
+
+def dia_semana(nombre):
+    """Número (lunes = 0) de un día escrito en español, con o sin tilde."""
+    try:
+        return DIAS_SEMANA.index(_normalizar(nombre))
+    except ValueError:
+        raise ValueError(f"Día de la semana desconocido: '{nombre}'") from None
+
+
+def resolver(inicio, fin, dias_semana=None, meses=None, festivos="incluir"):
+    """Fechas entre ``inicio`` y ``fin`` (inclusive) que cumplen la regla.
+
+    ``festivos`` puede ser "incluir" (no filtra), "excluir" o "solo".
+    """
+    inicio, fin = pd.Timestamp(inicio).normalize(), pd.Timestamp(fin).normalize()
+    tabla = calendario(inicio.year, fin.year)
+    seleccion = (tabla.index >= inicio) & (tabla.index <= fin)
+    if dias_semana is not None:
+        seleccion &= tabla["dia_semana"].isin([dia_semana(dia) for dia in dias_semana]).to_numpy()
+    if meses is not None:
+        seleccion &= tabla["mes"].isin([int(mes) for mes in meses]).to_numpy()
+    if festivos == "excluir":
+        seleccion &= ~tabla["festivo"].to_numpy()
+    elif festivos == "solo":
+        seleccion &= tabla["festivo"].to_numpy()
+    elif festivos != "incluir":
+        raise ValueError(f"Valor inválido para 'festivos': '{festivos}'")
+    return tabla.index[seleccion]
@@ -0,0 +1,364 @@
+"""Motor genérico de actividades comerciales.
+
+Cada actividad se declara en un archivo TOML de la carpeta ``campanas/``
+(banners, niveles de productos con su descuento, periodo de la actividad,
+periodo base y valor de inscripción) y se evalúa con la misma lógica que antes
+estaba copiada en cada página. Un periodo puede ser un rango, una lista de
+fechas o una regla de recurrencia (días de la semana, meses, festivos) dentro
+de un rango; el periodo base puede ser el de la actividad corrido
+``semanas_antes`` semanas.
+
+Todas las actividades se evalúan juntas sobre el cubo diario (o sobre las
+filas de ventas, que se suman por día, banner y producto en una sola pasada),
+y cada suma diaria se etiqueta con las (actividad, periodo) a las que
+pertenece. Los periodos definidos como rango se resuelven con el índice de
+sumas acumuladas, sin recorrer el cubo, y las listas de fechas sólo leen los
+bloques de filas de esos días. Los niveles de descuento no generan filtros propios: cada producto lleva su tasa y
+el descuento se aplica con una sola multiplicación.
+"""
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
+
+import pandas as pd # type: ignore
+import streamlit as st # type: ignore
+import toml # type: ignore
+
+from pac import calendario
+from pac.datos import construir_cubo, es_cubo, version_datos
+from pac.indice import indice_fechas, indice_ventas
+from pac.instrumentacion import medida
+from pac.memoria import registrar
+from pac.refresco import registrar_calentador
+from pac.resultados import Resultado, resultados_persistentes
+
+# Carpeta con las definiciones de las actividades
+DIRECTORIO_CAMPANAS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "campanas")
+
+
+@dataclass(frozen=True)
+class Periodo:
+    # Un periodo es un rango de fechas (inclusivo) o una lista de fechas sueltas
+    inicio: pd.Timestamp = None
+    fin: pd.Timestamp = None
+    fechas: tuple = ()
+
+    @property
+    def es_rango(self):
+        return not self.fechas
+
+    def dias(self):
+        if self.fechas:
+            return pd.DatetimeIndex(self.fechas)
+        return pd.date_range(self.inicio, self.fin, freq="D")
+
+
+@dataclass(frozen=True)
+class Nivel:
+    descuento: float
+    productos: tuple
+
+
+@dataclass(frozen=True)
+class Campana:
+    identificador: str
+    nombre: str
+    banners: tuple
+    niveles: tuple
+    actividad: Periodo
+    base: Periodo
+    valor_inscripcion: float = 0
+    vista: dict = field(default_factory=dict, hash=False, compare=False)
+    # Huella de la definición: cambia si cambia cualquier parámetro del TOML
+    huella: str = field(default="", compare=False)
+
+    @property
+    def productos(self):
+        return [producto for nivel in self.niveles for producto in nivel.productos]
+
+    @property
+    def tasas(self):
+        # Tasa de descuento de cada producto, en el orden de los niveles
+        return pd.Series(
+            [nivel.descuento for nivel in self.niveles for _ in nivel.productos],
+            index=pd.Index(self.productos, name='Código Homologado'), dtype='float64',
+        )
+
+    @property
+    def tiene_descuento(self):
+        return any(nivel.descuento for nivel in self.niveles)
+
+
+# Claves de una regla de recurrencia dentro de un periodo
+CLAVES_REGLA = ("dias_semana", "meses", "festivos")
+
+
+def _periodo(definicion, nombre, referencia=None):
+    if "semanas_antes" in definicion:
+        # Las mismas fechas del periodo de referencia, corridas semanas atrás
+        if referencia is None:
+            raise ValueError(f"El periodo '{nombre}' no tiene periodo de referencia para 'semanas_antes'")
+        corrimiento = pd.Timedelta(weeks=int(definicion["semanas_antes"]))
+        if referencia.es_rango:
+            return Periodo(inicio=referencia.inicio - corrimiento, fin=referencia.fin - corrimiento)
+        return Periodo(fechas=tuple(fecha - corrimiento for fecha in referencia.fechas))
+    if "fechas" in definicion:
+        # Una fecha repetida se cuenta una sola vez, igual que en un rango
+        fechas = pd.DatetimeIndex(pd.to_datetime(definicion["fechas"])).normalize().unique()
+        if len(fechas) == 0:
+            raise ValueError(f"El periodo '{nombre}' no tiene fechas")
+        return Periodo(fechas=tuple(fechas))
+    if "inicio" in definicion and "fin" in definicion:
+        inicio, fin = pd.Timestamp(definicion["inicio"]), pd.Timestamp(definicion["fin"])
+        if inicio > fin:
+            raise ValueError(f"El periodo '{nombre}' termina antes de empezar")
+        if not any(clave in definicion for clave in CLAVES_REGLA):
+            return Periodo(inicio=inicio, fin=fin)
+        # Regla de recurrencia: se resuelve contra la tabla de calendario
+        fechas = calendario.resolver(inicio, fin, **{clave: definicion[clave] for clave in CLAVES_REGLA if clave in definicion})
+        if len(fechas) == 0:
+            raise ValueError(f"La regla del periodo '{nombre}' no selecciona ninguna fecha")
+        return Periodo(fechas=tuple(fechas))
+    raise ValueError(f"El periodo '{nombre}' necesita 'fechas', 'inicio' y 'fin' o 'semanas_antes'")
+
+
+def crear_campana(identificador, definicion):
+    """Valida una definición (ya leída del TOML) y la convierte en Campana."""
+    for clave in ("nombre", "banners", "niveles", "actividad", "base"):
+        if clave not in definicion:
+            raise ValueError(f"La actividad '{identificador}' no define '{clave}'")
+
+    niveles = []
+    vistos = set()
+    for nivel in definicion["niveles"]:
+        descuento = float(nivel.get("descuento", 0))
+        if not 0 <= descuento < 1:
+            raise ValueError(f"Descuento inválido en '{identificador}': {descuento}")
+        productos = tuple(str(producto).strip().upper() for producto in nivel["productos"])
+        # Un producto repetido aparecería dos veces en la tabla y en el total
+        repetidos = {producto for producto in productos if productos.count(producto) > 1}
+        if repetidos:
+            raise ValueError(f"Productos repetidos en un nivel de '{identificador}': {sorted(repetidos)}")
+        repetidos = vistos.intersection(productos)
+        if repetidos:
+            raise ValueError(f"Productos en más de un nivel de '{identificador}': {sorted(repetidos)}")
+        vistos.update(productos)
+        niveles.append(Nivel(descuento=descuento, productos=productos))
+
+    actividad = _periodo(definicion["actividad"], "actividad")
+    return Campana(
+        identificador=identificador,
+        nombre=definicion["nombre"],
+        banners=tuple(dict.fromkeys(banner.strip() for banner in definicion["banners"])),
+        niveles=tuple(niveles),
+        actividad=actividad,
+        base=_periodo(definicion["base"], "base", referencia=actividad),
+        valor_inscripcion=definicion.get("valor_inscripcion", 0),
+        vista=dict(definicion.get("vista", {})),
+        huella=_huella(identificador, definicion),
+    )
+
+
+def _huella(identificador, definicion):
+    texto = json.dumps([identificador, definicion], sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(texto.encode("utf-8")).hexdigest()[:16]
+
+
+def listar_campanas(directorio=DIRECTORIO_CAMPANAS):
+    return sorted(os.path.splitext(nombre)[0] for nombre in os.listdir(directorio) if nombre.endswith(".toml"))
+
+
+def cargar_campana(identificador, directorio=DIRECTORIO_CAMPANAS):
+    """Lee ``campanas/<identificador>.toml``."""
+    return crear_campana(identificador, toml.load(os.path.join(directorio, identificador + ".toml")))
+
+
+def _periodos(campana):
+    return (("actividad", campana.actividad), ("base", campana.base))
+
+
+def _membresias(campanas, incluir_rangos):
+    # Tablas pequeñas que dicen a qué (actividad, periodo) pertenece cada fecha,
+    # banner y producto
+    fechas, banners, productos = [], [], []
+    for campana in campanas:
+        for periodo, definicion in _periodos(campana):
+            if incluir_rangos or not definicion.es_rango:
+                fechas.extend((campana.identificador, periodo, dia) for dia in definicion.dias())
+        banners.extend((campana.identificador, banner) for banner in campana.banners)
+        productos.extend((campana.identificador, producto) for producto in campana.productos)
+    # Sin duplicados: el merge con las sumas diarias repetiría esas ventas
+    return (
+        pd.DataFrame(fechas, columns=['campana', 'periodo', 'Date']).drop_duplicates(),
+        pd.DataFrame(banners, columns=['campana', 'Banner']).drop_duplicates(),
+        pd.DataFrame(productos, columns=['campana', 'Código Homologado']).drop_duplicates(),
+    )
+
+
+@medida("filtro")
+def _sumar_por_membresia(df, campanas, incluir_rangos=True, por_fecha=None):
+    fechas, banners, productos = _membresias(campanas, incluir_rangos)
+    if fechas.empty:
+        return {}
+
+    # Una sola pasada sobre las ventas: quedarse con las filas que pertenecen a
+    # alguna actividad y sumarlas por día, banner y producto. Con el índice de
+    # fechas sólo se leen los bloques de filas de los días pedidos
+    if por_fecha is not None:
+        df = df.take(por_fecha.filas(fechas['Date']))
+        relevantes = df['Banner'].isin(banners['Banner']) & df['Código Homologado'].isin(productos['Código Homologado'])
+    else:
+        relevantes = (
+            df['Date'].isin(fechas['Date'])
+            & df['Banner'].isin(banners['Banner'])
+            & df['Código Homologado'].isin(productos['Código Homologado'])
+        )
+    datos = df[relevantes]
+    agregado = datos if es_cubo(datos) else construir_cubo(datos)
+    agregado['Banner'] = agregado['Banner'].astype(object)
+    agregado['Código Homologado'] = agregado['Código Homologado'].astype(object)
+
+    # Etiquetar cada suma diaria con todas las actividades a las que pertenece
+    etiquetado = (
+        agregado.merge(fechas, on='Date')
+        .merge(banners, on=['campana', 'Banner'])
+        .merge(productos, on=['campana', 'Código Homologado'])
+    )
+    sumas = etiquetado.groupby(['campana', 'periodo', 'Código Homologado'])[['unidades', 'bruto']].sum()
+    return {clave: grupo.droplevel([0, 1]) for clave, grupo in sumas.groupby(level=[0, 1])}
+
+
+def _sumar_rangos(indice, campanas):
+    # Cada periodo por rango es una consulta al índice con todos sus productos
+    sumas = {}
+    for campana in campanas:
+        for periodo, definicion in _periodos(campana):
+            if definicion.es_rango:
+                sumas[(campana.identificador, periodo)] = indice.sumar(
+                    definicion.inicio, definicion.fin, campana.banners, campana.productos)
+    return sumas
+
+
+@medida("agregacion")
+def evaluar_campanas(df, campanas, indice=None, por_fecha=None):
+    """Evalúa varias actividades con una sola pasada sobre las ventas.
+
+    Si se pasa un ``indice`` (IndiceAcumulado del mismo dataset), los periodos
+    por rango se calculan con él; con ``por_fecha`` (IndiceFechas) las fechas
+    sueltas se leen por bloques. Devuelve un diccionario identificador -> Resultado.
+    """
+    campanas = list(campanas)
+    sumas = _sumar_por_membresia(df, campanas, incluir_rangos=indice is None, por_fecha=por_fecha)
+    if indice is not None:
+        sumas.update(_sumar_rangos(indice, campanas))
+    vacio = pd.DataFrame({'unidades': pd.Series(dtype='int64'), 'bruto': pd.Series(dtype='float64')})
+
+    resultados = {}
+    for campana in campanas:
+        actividad = sumas.get((campana.identificador, "actividad"), vacio)
+        base = sumas.get((campana.identificador, "base"), vacio)
+
+        # Ventas brutas de todos los productos de la actividad, en el orden de la definición
+        tasas = campana.tasas
+        ventas_bruto = actividad['bruto'].reindex(tasas.index, fill_value=0)
+        ventas_monetarias_base = base['bruto'].reindex(tasas.index, fill_value=0)
+
+        # Aplicar la tasa de cada producto en una sola operación
+        ventas_monetarias_actividad = ventas_bruto * (1 - tasas)
+        total_descuento = (ventas_bruto * tasas).sum()
+
+        resultados[campana.identificador] = _armar_resultado(
+            campana, ventas_monetarias_actividad, ventas_monetarias_base,
+            actividad['unidades'].sum(), base['unidades'].sum(), total_descuento,
+        )
+    return resultados
+
+
+# Los resultados de todas las actividades se calculan una vez por versión del
+# dataset y de las definiciones, y se comparten entre páginas y sesiones. Lo ya
+# calculado se lee de disco; sólo se evalúan las actividades que cambiaron
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _resultados_compartidos(_df, version, huellas, _campanas):
+    resultados = resultados_persistentes(_campanas, version, lambda faltantes: evaluar_campanas(
+        _df, faltantes, indice=indice_ventas(_df), por_fecha=indice_fechas(_df)))
+    for identificador, resultado in resultados.items():
+        registrar(f"resultado {identificador} {version}", resultado)
+    return resultados
+
+
+def cargar_campanas(directorio=DIRECTORIO_CAMPANAS):
+    """Todas las actividades de ``campanas/``, en el orden de ``vista.orden``."""
+    campanas = [cargar_campana(identificador, directorio) for identificador in listar_campanas(directorio)]
+    return sorted(campanas, key=lambda campana: (campana.vista.get("orden", len(campanas)), campana.identificador))
+
+
+def resultados_todas(df):
+    """Resultados de todas las actividades de ``campanas/``, calculados en una sola pasada.
+
+    No usa elementos de Streamlit, así que sirve desde hilos en segundo plano.
+    """
+    campanas = cargar_campanas()
+    return _resultados_compartidos(df, version_datos(df), tuple(campana.huella for campana in campanas), campanas)
+
+
+@medida("actividades")
+def evaluar_todas(df):
+    """Como ``resultados_todas``, mostrando un aviso mientras se calcula."""
+    with st.spinner("Calculando actividades..."):
+        return resultados_todas(df)
+
+
+@registrar_calentador
+def precalcular(df):
+    """Deja listos en disco y en memoria los resultados de todas las actividades para ``df``.
+
+    Se llama al recargar el libro, antes de publicar la versión nueva.
+    """
+    resultados_todas(df)
+
+
+def _armar_resultado(campana, ventas_monetarias_actividad, ventas_monetarias_base,
+                     unidades_actividad, unidades_base, total_descuento):
+    columna_base = f"Ventas Monetarias {campana.vista.get('periodo_base', 'Periodo Anterior')}"
+    columna_actividad = f"Ventas Monetarias {campana.vista.get('periodo_actividad', 'Actividad')}"
+
+    # Calcular crecimiento monetario y porcentaje
+    crecimiento_monetario = ventas_monetarias_actividad - ventas_monetarias_base
+    crecimiento_porcentaje = (crecimiento_monetario / ventas_monetarias_base.replace(0, pd.NA)) * 100
+
+    # Crear DataFrame de utilidad
+    utilidad_df = pd.DataFrame({
+        'Producto': ventas_monetarias_actividad.index,
+        columna_base: ventas_monetarias_base.values,
+        columna_actividad: ventas_monetarias_actividad.values,
+        'Crecimiento Monetario': crecimiento_monetario.values,
+        'Crecimiento (%)': crecimiento_porcentaje.values
+    }).reset_index(drop=True)
+
+    # Agregar fila total; el valor de inscripción se descuenta del crecimiento
+    total_fila = pd.DataFrame({
+        'Producto': ['Total'],
+        columna_base: [ventas_monetarias_base.sum()],
+        columna_actividad: [ventas_monetarias_actividad.sum()],
+        'Crecimiento Monetario': [crecimiento_monetario.sum() - campana.valor_inscripcion],
+        'Crecimiento (%)': [(crecimiento_monetario.sum() / ventas_monetarias_base.sum()) * 100]
+    })
+
+    utilidad_df = pd.concat([utilidad_df[utilidad_df['Producto'] != 'Total'].sort_values(by=columna_actividad, ascending=False), total_fila], ignore_index=True)
+
+    # Calcular el crecimiento en unidades y su porcentaje
+    crecimiento_bruto_unidades = unidades_actividad - unidades_base
+    crecimiento_bruto_porcentaje_unidades = ((unidades_actividad - unidades_base) / unidades_base) * 100
+
+    kpis = {
+        "unidades_base": unidades_base,
+        "unidades_actividad": unidades_actividad,
+        "crecimiento_unidades": crecimiento_bruto_unidades,
+        "crecimiento_unidades_pct": crecimiento_bruto_porcentaje_unidades,
+        "total_descuento": total_descuento,
+        "crecimiento_monetario": crecimiento_monetario.sum(),
+        "valor_inscripcion": campana.valor_inscripcion,
+        "crecimiento_monetario_total": crecimiento_monetario.sum() - campana.valor_inscripcion,
+    }
+    return Resultado(kpis=kpis, utilidad_df=utilidad_df)
@@ -0,0 +1,116 @@
+"""Cerrojos por clave para que un cálculo costoso corra una sola vez a la vez.
+
+Cuando varias sesiones piden lo mismo al mismo tiempo (la misma hoja, el
+resultado de la misma actividad), la primera lo calcula y las demás esperan su
+cerrojo; al entrar vuelven a mirar la caché y encuentran el resultado hecho.
+Con un archivo de bloqueo por clave lo mismo vale entre procesos, por ejemplo
+varias réplicas de Streamlit en el mismo servidor.
+"""
+import contextlib
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+def _bloquear(archivo):
+    if fcntl is not None:
+        fcntl.flock(archivo.fileno(), fcntl.LOCK_EX)
+        return
+    while True:
+        try:
+            msvcrt.locking(archivo.fileno(), msvcrt.LK_LOCK, 1)
+            return
+        except OSError:
+            # LK_LOCK se rinde después de unos segundos; seguir esperando
+            continue
+
+
+def _desbloquear(archivo):
+    if fcntl is not None:
+        fcntl.flock(archivo.fileno(), fcntl.LOCK_UN)
+    else:
+        archivo.seek(0)
+        msvcrt.locking(archivo.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class _Entrada:
+    def __init__(self):
+        self.cerrojo = threading.RLock()
+        self.usos = 0
+        # Sólo las modifica el hilo que tiene el cerrojo
+        self.profundidad = 0
+        self.archivo = None
+
+
+class Cerrojos:
+    """Un cerrojo reentrante por clave, que se descarta cuando nadie lo usa.
+
+    Si se pasa ``archivo`` (función clave -> ruta), la primera vez que un hilo
+    toma la clave también se bloquea ese archivo, de modo que otros procesos
+    esperan igual que los hilos.
+    """
+
+    def __init__(self, archivo=None):
+        self._archivo = archivo
+        self._guardia = threading.Lock()
+        self._cerrojos = {}
+
+    def _entrar(self, clave, entrada):
+        entrada.cerrojo.acquire()
+        if self._archivo is None or entrada.profundidad:
+            entrada.profundidad += 1
+            return
+        try:
+            ruta = self._archivo(clave)
+            os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+            archivo = open(ruta, "a+b")
+            try:
+                _bloquear(archivo)
+            except BaseException:
+                archivo.close()
+                raise
+        except BaseException:
+            entrada.cerrojo.release()
+            raise
+        entrada.archivo = archivo
+        entrada.profundidad = 1
+
+    def _salir(self, entrada):
+        entrada.profundidad -= 1
+        if entrada.profundidad == 0 and entrada.archivo is not None:
+            try:
+                _desbloquear(entrada.archivo)
+            finally:
+                entrada.archivo.close()
+                entrada.archivo = None
+        entrada.cerrojo.release()
+
+    @contextlib.contextmanager
+    def tomar(self, *claves):
+        # Tomar varias claves siempre en el mismo orden evita bloqueos cruzados
+        claves = sorted(set(claves))
+        with self._guardia:
+            entradas = []
+            for clave in claves:
+                entrada = self._cerrojos.setdefault(clave, _Entrada())
+                entrada.usos += 1
+                entradas.append(entrada)
+        tomados = []
+        try:
+            for clave, entrada in zip(claves, entradas):
+                self._entrar(clave, entrada)
+                tomados.append(entrada)
+            yield
+        finally:
+            for entrada in reversed(tomados):
+                self._salir(entrada)
+            with self._guardia:
+                for clave, entrada in zip(claves, entradas):
+                    entrada.usos -= 1
+                    if entrada.usos == 0:
+                        del self._cerrojos[clave]
@@ -0,0 +1,464 @@
+"""Carga de la hoja 'Análisis PAC' con una copia columnar en disco.
+
+Leer el Excel con openpyxl es el paso más lento de todas las páginas, así que
+la hoja se convierte una sola vez a un archivo Arrow IPC sin comprimir y las
+cargas siguientes leen esa copia. La copia se reconstruye sólo cuando cambia el
+libro (fecha de modificación, tamaño y, si hace falta desempatar, su hash).
+
+Las copias se abren con un mapeo de memoria: las columnas sin nulos quedan
+sobre las páginas del archivo en lugar de copiarse al proceso, y varias
+réplicas en el mismo servidor comparten esas páginas por la caché del sistema
+operativo.
+
+Las filas se guardan ordenadas por fecha, de modo que cada día es un bloque
+contiguo y una lista de fechas se resuelve con unos pocos cortes.
+
+Al leer la hoja también se materializa el cubo diario: unidades y ventas
+brutas sumadas por fecha, banner y producto, que es todo lo que necesitan las
+actividades. El cubo se guarda junto a la copia columnar y tiene muchas menos
+filas que la hoja. Cada carga guarda además un hash de las filas de cada día;
+cuando el libro cambia, el cubo sólo se recalcula para los días nuevos o
+modificados.
+
+El cubo se guarda una sola vez por proceso y se comparte entre todas las
+sesiones y páginas (se recarga solo cuando cambia el libro); cada página recibe
+una vista que no puede modificar los datos compartidos.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+
+import numpy as np # type: ignore
+import pandas as pd # type: ignore
+import pyarrow as pa # type: ignore
+import pyarrow.parquet as pq # type: ignore
+import streamlit as st # type: ignore
+
+from pac.concurrencia import Cerrojos
+from pac.instrumentacion import anotar, medida
+from pac.memoria import registrar
+from pac.refresco import Refrescador
+
+logger = logging.getLogger(__name__)
+
+# Ruta al archivo Excel y hoja con las ventas. PAC_RUTA_DATOS permite apuntar a
+# otro archivo, por ejemplo uno sintético en .parquet o .arrow para medir
+RUTA_EXCEL = os.environ.get("PAC_RUTA_DATOS", "PAC_Oct/data/PAC_Oct.xlsx")
+HOJA = 'Análisis PAC'
+
+# Carpeta donde se guarda la copia columnar del libro
+DIRECTORIO_CACHE = os.path.join(os.path.dirname(RUTA_EXCEL), ".cache")
+
+# Versión de la transformación aplicada al leer el libro; al cambiarla se
+# descartan las copias en disco generadas con la versión anterior
+VERSION_FORMATO = 7
+
+# Columnas que usan las páginas de actividades; el resto de la hoja no se lee
+COLUMNAS = ('Date', 'Banner', 'Código Homologado', 'Cantidad Vendida Actual', 'Precio')
+
+# Granularidad del cubo diario
+COLUMNAS_CUBO = ('Date', 'Banner', 'Código Homologado')
+
+# Columnas numéricas y el tipo compacto en que se guardan. Lo que no se pueda
+# convertir queda en 0 y se reporta en cuarentena. Las unidades pasan a int32
+# sólo si no traen decimales; el precio queda en float64 para que el producto
+# unidades * precio no se desborde ni pierda precisión.
+COLUMNAS_NUMERICAS = {'Cantidad Vendida Actual': 'int32', 'Precio': 'float64'}
+COLUMNAS_CUARENTENA = ['Fila', 'Columna', 'Valor original', 'Motivo']
+
+# Lecturas en curso por libro y hoja: si varias sesiones (o réplicas en el
+# mismo servidor) encuentran la copia vencida al mismo tiempo, sólo una lee el Excel
+_EN_CURSO = Cerrojos(archivo=lambda clave: _rutas_cache(*clave)[1] + ".lock")
+
+# Formatos conocidos de la columna Date cuando llega como texto
+FORMATOS_FECHA = ("%Y-%m-%d", "%Y-%m-%d %H:%M:%S", "%d/%m/%Y")
+
+
+def _firma_archivo(ruta):
+    estado = os.stat(ruta)
+    return {"mtime_ns": estado.st_mtime_ns, "tamano": estado.st_size}
+
+
+def _hash_archivo(ruta):
+    sha = hashlib.sha256()
+    with open(ruta, "rb") as archivo:
+        for bloque in iter(lambda: archivo.read(1 << 20), b""):
+            sha.update(bloque)
+    return sha.hexdigest()
+
+
+def _rutas_cache(ruta_excel, hoja, directorio):
+    base = os.path.splitext(os.path.basename(ruta_excel))[0]
+    nombre = base + "__" + re.sub(r'\W+', '_', hoja)
+    return (
+        os.path.join(directorio, nombre + ".arrow"),
+        os.path.join(directorio, nombre + ".json"),
+        os.path.join(directorio, nombre + "__cuarentena.csv"),
+        os.path.join(directorio, nombre + "__cubo.arrow"),
+    )
+
+
+def _leer_manifiesto(ruta):
+    try:
+        with open(ruta, encoding="utf-8") as archivo:
+            return json.load(archivo)
+    except (OSError, ValueError):
+        return None
+
+
+def _escribir_atomico(ruta, escribir):
+    # Escribir en un temporal y renombrar, para que ningún lector vea un archivo a medias
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    try:
+        escribir(temporal)
+        os.replace(temporal, ruta)
+    finally:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+
+
+def _parsear_fechas(columna):
+    # Las fechas se repiten en miles de filas: se convierten sólo los valores únicos
+    if pd.api.types.is_datetime64_any_dtype(columna):
+        return columna.dt.normalize()
+    codigos, unicos = pd.factorize(columna)
+    fechas = None
+    for formato in FORMATOS_FECHA:
+        try:
+            fechas = pd.to_datetime(unicos, format=formato)
+            break
+        except (ValueError, TypeError):
+            continue
+    if fechas is None:
+        fechas = pd.to_datetime(unicos, errors='coerce', format='mixed')
+    fechas = pd.DatetimeIndex(fechas).normalize()
+    return pd.Series(fechas.array.take(codigos, allow_fill=True), index=columna.index, name=columna.name)
+
+
+def _categorizar(columna, limpiar):
+    # Limpiar sólo los valores distintos y guardar la columna como categórica,
+    # de modo que los filtros comparen códigos enteros en lugar de textos
+    codigos, unicos = pd.factorize(columna)
+    codigos_limpios, categorias = pd.factorize(limpiar(pd.Series(unicos, dtype=object)))
+    codigos = np.where(codigos >= 0, codigos_limpios[codigos], -1)
+    return pd.Series(pd.Categorical.from_codes(codigos, categories=categorias), index=columna.index, name=columna.name)
+
+
+def _convertir_numerica(columna, tipo):
+    valores = pd.to_numeric(columna, errors='coerce')
+    invalidos = valores.isna()
+    cuarentena = pd.DataFrame({
+        # Número de fila en el Excel: el encabezado ocupa la fila 1
+        'Fila': columna.index[invalidos] + 2,
+        'Columna': columna.name,
+        'Valor original': columna[invalidos].astype(object),
+        'Motivo': np.where(columna[invalidos].isna(), 'vacío', 'no numérico'),
+    })
+    valores = valores.fillna(0)
+    if tipo == 'int32' and not (valores.abs().max() < 2**31 and (valores % 1 == 0).all()):
+        tipo = 'float64'
+    return valores.astype(tipo), cuarentena
+
+
+def _limpiar(df):
+    df.columns = df.columns.str.strip()  # Limpiar los nombres de las columnas
+    if 'Date' in df:
+        df['Date'] = _parsear_fechas(df['Date'])  # Fechas sin hora, una sola vez por carga
+    if 'Código Homologado' in df:
+        df['Código Homologado'] = _categorizar(df['Código Homologado'], lambda s: s.str.strip().str.upper())  # Limpiar y estandarizar
+    if 'Banner' in df:
+        df['Banner'] = _categorizar(df['Banner'], lambda s: s.str.strip())
+    cuarentena = []
+    for col, tipo in COLUMNAS_NUMERICAS.items():
+        if col in df:
+            df[col], filas = _convertir_numerica(df[col], tipo)
+            cuarentena.append(filas)
+    cuarentena = pd.concat(cuarentena, ignore_index=True) if cuarentena else pd.DataFrame(columns=COLUMNAS_CUARENTENA)
+    return df, cuarentena
+
+
+def _leer_fuente(ruta, hoja, usecols):
+    # Además del libro se aceptan archivos Parquet y Arrow con las mismas columnas
+    # (la hoja no aplica); sirven para probar con más filas de las que caben en Excel
+    extension = os.path.splitext(ruta)[1].lower()
+    if extension == ".parquet":
+        nombres = pq.read_schema(ruta).names
+        return pd.read_parquet(ruta, columns=[n for n in nombres if usecols is None or usecols(n)])
+    if extension in (".arrow", ".feather"):
+        with pa.memory_map(ruta) as fuente:
+            tabla = pa.ipc.open_file(fuente).read_all()
+        return tabla.select([n for n in tabla.column_names if usecols is None or usecols(n)]).to_pandas()
+    return pd.read_excel(ruta, sheet_name=hoja, usecols=usecols)
+
+
+@medida("lectura")
+def _leer_excel(ruta_excel, hoja, columnas):
+    # Los encabezados del libro pueden traer espacios, así que se comparan ya limpios
+    usecols = None if columnas is None else (lambda col: str(col).strip() in columnas)
+    df, cuarentena = _limpiar(_leer_fuente(ruta_excel, hoja, usecols))
+    if 'Date' in df:
+        # Orden estable por fecha y filas sin fecha al final; la cuarentena ya
+        # guardó el número de fila original
+        df = df.sort_values('Date', kind='stable', na_position='last', ignore_index=True)
+    if columnas is not None:
+        faltantes = [col for col in columnas if col not in df.columns]
+        if faltantes:
+            raise KeyError(f"La hoja '{hoja}' no tiene las columnas {faltantes}")
+    if len(cuarentena):
+        logger.warning("%d valores de %s no eran numéricos y se tomaron como 0", len(cuarentena), ruta_excel)
+    return df, cuarentena
+
+
+def _cubre(manifiesto, columnas):
+    # Pedir None es pedir todas las columnas de la hoja
+    if columnas is None:
+        return manifiesto.get("completa", False)
+    return set(columnas) <= set(manifiesto.get("columnas", ()))
+
+
+def _preparar_para_arrow(df):
+    # Arrow exige un tipo por columna; las columnas con tipos mezclados se guardan como texto
+    df = df.copy(deep=False)
+    for col in df.columns[df.dtypes == object]:
+        if pd.api.types.infer_dtype(df[col], skipna=True).startswith("mixed"):
+            df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+    return df
+
+
+def _escribir_arrow(df, ruta):
+    tabla = pa.Table.from_pandas(df, preserve_index=False)
+    with pa.OSFile(ruta, "wb") as destino, pa.ipc.new_file(destino, tabla.schema) as escritor:
+        escritor.write_table(tabla)
+
+
+def _abrir_arrow(ruta, version, columnas=None):
+    # La tabla queda sobre el mapeo de memoria; split_blocks evita juntar las
+    # columnas en un bloque nuevo, así que las que no tienen nulos no se copian
+    with pa.memory_map(ruta) as fuente:
+        tabla = pa.ipc.open_file(fuente).read_all()
+    if columnas is not None:
+        tabla = tabla.select(columnas)
+    df = tabla.to_pandas(split_blocks=True)
+    df.attrs["version"] = version
+    return df
+
+
+def _vigente(manifiesto, firma, hoja, ruta_excel):
+    if manifiesto is None or manifiesto.get("hoja") != hoja or manifiesto.get("formato") != VERSION_FORMATO:
+        return False
+    if manifiesto.get("mtime_ns") == firma["mtime_ns"] and manifiesto.get("tamano") == firma["tamano"]:
+        return True
+    # El libro pudo copiarse o tocarse sin cambiar su contenido: desempatar con el hash
+    if manifiesto.get("tamano") == firma["tamano"] and manifiesto.get("sha256"):
+        return manifiesto["sha256"] == _hash_archivo(ruta_excel)
+    return False
+
+
+def _version(sha256):
+    # Identifica el contenido del libro y la transformación aplicada al leerlo
+    return f"{sha256[:16]}-v{VERSION_FORMATO}"
+
+
+def version_datos(df):
+    """Versión del dataset del que proviene ``df`` (se conserva en vistas y filtros)."""
+    return df.attrs.get("version")
+
+
+def _clave_libro(ruta_excel, hoja, directorio_cache):
+    return (os.path.abspath(ruta_excel), hoja, os.path.abspath(directorio_cache))
+
+
+def leer_hoja(ruta_excel=RUTA_EXCEL, hoja=HOJA, directorio_cache=DIRECTORIO_CACHE, columnas=COLUMNAS):
+    """Devuelve la hoja limpia, usando la copia en disco si sigue vigente.
+
+    Sólo se leen las ``columnas`` pedidas (todas si es None), tanto del Excel
+    como de la copia en disco. Quien llega mientras otra llamada reconstruye la
+    copia espera y después lee la copia ya escrita.
+    """
+    with _EN_CURSO.tomar(_clave_libro(ruta_excel, hoja, directorio_cache)):
+        return _leer_hoja(ruta_excel, hoja, directorio_cache, columnas)
+
+
+def _leer_hoja(ruta_excel, hoja, directorio_cache, columnas):
+    columnas = None if columnas is None else list(columnas)
+    ruta_arrow, ruta_manifiesto, ruta_cuarentena, _ = _rutas_cache(ruta_excel, hoja, directorio_cache)
+    firma = _firma_archivo(ruta_excel)
+    manifiesto = _leer_manifiesto(ruta_manifiesto)
+
+    vigente = os.path.exists(ruta_arrow) and _vigente(manifiesto, firma, hoja, ruta_excel)
+    if vigente and _cubre(manifiesto, columnas):
+        if manifiesto["mtime_ns"] != firma["mtime_ns"]:
+            manifiesto.update(firma)
+            _guardar_manifiesto(ruta_manifiesto, manifiesto)
+        return _abrir_arrow(ruta_arrow, _version(manifiesto["sha256"]), columnas)
+
+    # Si la copia vigente tiene otras columnas, se reconstruye con la unión para
+    # que distintas proyecciones no se pisen entre sí
+    a_guardar = columnas
+    if vigente and columnas is not None and not manifiesto.get("completa", False):
+        a_guardar = list(dict.fromkeys(manifiesto["columnas"] + columnas))
+
+    # Leer el archivo Excel y seleccionar la hoja especificada
+    sha256 = _hash_archivo(ruta_excel)
+    df, cuarentena = _leer_excel(ruta_excel, hoja, a_guardar)
+    df.attrs["version"] = _version(sha256)
+
+    try:
+        os.makedirs(directorio_cache, exist_ok=True)
+        _escribir_atomico(ruta_cuarentena, lambda ruta: cuarentena.to_csv(ruta, index=False))
+        _escribir_atomico(ruta_arrow, lambda ruta: _escribir_arrow(_preparar_para_arrow(df), ruta))
+        _guardar_manifiesto(ruta_manifiesto, {
+            **firma, "hoja": hoja, "formato": VERSION_FORMATO, "columnas": list(df.columns), "completa": a_guardar is None, "sha256": sha256,
+            "dias": _hashes_por_dia(df),
+        })
+    except Exception as e:
+        # Sin copia en disco la página sigue funcionando, sólo que más lenta
+        logger.warning("No se pudo guardar la copia columnar de %s: %s", ruta_excel, e)
+        return df if columnas is None else df[columnas]
+    # Devolver la copia mapeada y no la recién leída, para compartir sus páginas
+    return _abrir_arrow(ruta_arrow, df.attrs["version"], columnas)
+
+
+def es_cubo(df):
+    """Indica si ``df`` es un cubo diario y no filas de ventas."""
+    return 'bruto' in df.columns
+
+
+@medida("cubo")
+def construir_cubo(df):
+    """Suma unidades y ventas brutas por fecha, banner y producto."""
+    cubo = pd.DataFrame({
+        'Date': df['Date'],
+        'Banner': df['Banner'],
+        'Código Homologado': df['Código Homologado'],
+        'unidades': df['Cantidad Vendida Actual'],
+        'bruto': df['Cantidad Vendida Actual'] * df['Precio'],
+    }).groupby(list(COLUMNAS_CUBO), observed=True).sum().reset_index()
+    if pd.api.types.is_integer_dtype(cubo['unidades']):
+        cubo['unidades'] = cubo['unidades'].astype('int64')
+    for col in ('Banner', 'Código Homologado'):
+        if isinstance(cubo[col].dtype, pd.CategoricalDtype):
+            cubo[col] = cubo[col].cat.remove_unused_categories()
+    cubo.attrs["version"] = version_datos(df)
+    return cubo
+
+
+def _hashes_por_dia(df):
+    # Hash de las filas de cada día con las columnas que alimentan el cubo; el
+    # dataset está ordenado por fecha, así que cada día es un bloque contiguo
+    if not set(COLUMNAS) <= set(df.columns):
+        return None
+    fechas = df['Date'].to_numpy(dtype='datetime64[D]')
+    validas = len(fechas) - int(np.isnat(fechas).sum())
+    filas = pd.util.hash_pandas_object(df[list(COLUMNAS)].iloc[:validas], index=False).to_numpy()
+    inicios = np.flatnonzero(np.r_[True, fechas[1:validas] != fechas[:validas - 1]]) if validas else []
+    finales = np.append(inicios[1:], validas)
+    return {
+        str(fechas[inicio]): hashlib.blake2b(filas[inicio:fin].tobytes(), digest_size=8).hexdigest()
+        for inicio, fin in zip(inicios, finales)
+    }
+
+
+@medida("cubo")
+def _actualizar_cubo(cubo, df, cambiados):
+    # Reemplazar en el cubo anterior sólo los días cambiados, agregados desde sus filas
+    fechas = pd.to_datetime(sorted(cambiados))
+    conservado = cubo[~cubo['Date'].isin(fechas)]
+    nuevo = construir_cubo(df[df['Date'].isin(fechas)])
+    partes = []
+    for parte in (conservado, nuevo):
+        parte = parte.copy(deep=False)
+        # Mismas categorías que la carga completa, para que el orden de las filas coincida
+        for col in ('Banner', 'Código Homologado'):
+            parte[col] = parte[col].astype(object).astype(pd.CategoricalDtype(df[col].cat.categories))
+        partes.append(parte)
+    actualizado = pd.concat(partes, ignore_index=True).sort_values(list(COLUMNAS_CUBO), kind='stable', ignore_index=True)
+    for col in ('Banner', 'Código Homologado'):
+        actualizado[col] = actualizado[col].cat.remove_unused_categories()
+    actualizado.attrs["version"] = version_datos(df)
+    return actualizado
+
+
+def leer_cubo(ruta_excel=RUTA_EXCEL, hoja=HOJA, directorio_cache=DIRECTORIO_CACHE):
+    """Devuelve el cubo diario, usando el que está en disco si sigue vigente.
+
+    El cubo queda ordenado por fecha, igual que las filas de la hoja. Si el
+    libro cambió, sólo se vuelven a agregar los días cuyas filas cambiaron.
+    """
+    with _EN_CURSO.tomar(_clave_libro(ruta_excel, hoja, directorio_cache)):
+        return _leer_cubo(ruta_excel, hoja, directorio_cache)
+
+
+def _leer_cubo(ruta_excel, hoja, directorio_cache):
+    _, ruta_manifiesto, _, ruta_cubo = _rutas_cache(ruta_excel, hoja, directorio_cache)
+    manifiesto = _leer_manifiesto(ruta_manifiesto)
+    hay_cubo = manifiesto is not None and manifiesto.get("dias_cubo") is not None and os.path.exists(ruta_cubo)
+    if (hay_cubo and manifiesto["dias_cubo"] == manifiesto.get("dias")
+            and _vigente(manifiesto, _firma_archivo(ruta_excel), hoja, ruta_excel)):
+        return _abrir_arrow(ruta_cubo, _version(manifiesto["sha256"]))
+
+    # Sin cubo vigente: leer las filas (reconstruyendo la copia si hace falta)
+    dias_cubo = manifiesto["dias_cubo"] if hay_cubo and manifiesto.get("formato") == VERSION_FORMATO else None
+    df = leer_hoja(ruta_excel, hoja, directorio_cache, columnas=COLUMNAS)
+    manifiesto = _leer_manifiesto(ruta_manifiesto)
+    dias = manifiesto.get("dias") if manifiesto is not None and _version(manifiesto.get("sha256", "")) == version_datos(df) else None
+
+    if dias is not None and dias_cubo is not None:
+        cambiados = {dia for dia in set(dias) | set(dias_cubo) if dias.get(dia) != dias_cubo.get(dia)}
+        logger.info("Cubo diario de %s: %d de %d días cambiaron", ruta_excel, len(cambiados), len(dias))
+        cubo = _actualizar_cubo(_abrir_arrow(ruta_cubo, None), df, cambiados)
+    else:
+        cubo = construir_cubo(df)
+    try:
+        _escribir_atomico(ruta_cubo, lambda ruta: _escribir_arrow(cubo, ruta))
+        if dias is not None:
+            manifiesto["dias_cubo"] = dias
+            _guardar_manifiesto(ruta_manifiesto, manifiesto)
+    except Exception as e:
+        logger.warning("No se pudo guardar el cubo diario de %s: %s", ruta_excel, e)
+        return cubo
+    return _abrir_arrow(ruta_cubo, version_datos(cubo))
+
+
+def leer_cuarentena(ruta_excel=RUTA_EXCEL, hoja=HOJA, directorio_cache=DIRECTORIO_CACHE):
+    """Filas cuyos valores numéricos se reemplazaron por 0 en la última carga."""
+    ruta_cuarentena = _rutas_cache(ruta_excel, hoja, directorio_cache)[2]
+    if not os.path.exists(ruta_cuarentena):
+        return pd.DataFrame(columns=COLUMNAS_CUARENTENA)
+    return pd.read_csv(ruta_cuarentena, dtype={'Valor original': str})
+
+
+def _guardar_manifiesto(ruta, manifiesto):
+    def escribir(temporal):
+        with open(temporal, "w", encoding="utf-8") as archivo:
+            json.dump(manifiesto, archivo)
+    _escribir_atomico(ruta, escribir)
+
+
+# El cubo lo mantiene un Refrescador: cuando cambia el libro se reconstruye en
+# segundo plano y las páginas siguen viendo la versión anterior hasta que la
+# nueva está lista
+@st.cache_resource(show_spinner=False)
+def _cubo_compartido():
+    return Refrescador(RUTA_EXCEL, leer_cubo)
+
+
+def cubo_actual():
+    """Cubo diario vigente del proceso; no usa elementos de Streamlit, sirve desde otros hilos."""
+    cubo = _cubo_compartido().actual()
+    return registrar(f"cubo {version_datos(cubo)}", cubo)
+
+
+@medida("carga")
+def cargar_cubo():
+    """Cubo diario compartido por todas las sesiones, o None si no se pudo cargar."""
+    try:
+        with st.spinner("Cargando datos..."):
+            cubo = cubo_actual()
+    except Exception as e:
+        st.error(f"Error al cargar los datos: {e}")
+        return None
+    anotar(version=version_datos(cubo))
+    return cubo.copy(deep=False)
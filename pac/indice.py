@@ -0,0 +1,140 @@
+"""Índice de sumas acumuladas por día para cada (banner, producto).
+
+Las actividades por rango de fechas sólo necesitan totales de unidades y de
+ventas brutas dentro de una ventana. Con las sumas acumuladas por día, el
+total de cualquier ventana es la diferencia de dos posiciones, sin recorrer
+las filas de ventas.
+
+Para las actividades por lista de fechas, el dataset viene ordenado por Date y
+basta saber en qué filas empieza y termina cada día.
+"""
+import numpy as np # type: ignore
+import pandas as pd # type: ignore
+import streamlit as st # type: ignore
+
+from pac.datos import es_cubo, version_datos
+from pac.instrumentacion import medida
+from pac.memoria import registrar
+
+
+class IndiceAcumulado:
+    def __init__(self, df):
+        validas = df['Date'].notna() & df['Banner'].notna() & df['Código Homologado'].notna()
+        datos = df[validas]
+        banner = datos['Banner'].astype('category')
+        producto = datos['Código Homologado'].astype('category')
+
+        # Días desde el primer día con ventas
+        fechas = datos['Date'].to_numpy(dtype='datetime64[D]')
+        self.primer_dia = pd.Timestamp(fechas.min()) if len(fechas) else pd.Timestamp(0)
+        dia = (fechas - np.datetime64(self.primer_dia.date(), 'D')).astype(np.int64)
+        self.dias = int(dia.max()) + 1 if len(dia) else 0
+
+        # Sólo se guardan los pares (banner, producto) que tienen ventas
+        n_productos = max(len(producto.cat.categories), 1)
+        clave = banner.cat.codes.to_numpy(np.int64) * n_productos + producto.cat.codes.to_numpy(np.int64)
+        codigo_par, claves = pd.factorize(clave, sort=True)
+        self.banner_par = pd.Index(banner.cat.categories.take(claves // n_productos), name='Banner')
+        self.producto_par = pd.Index(producto.cat.categories.take(claves % n_productos), name='Código Homologado')
+
+        # Sumar por (par, día) y acumular a lo largo de los días; la columna 0
+        # queda en cero para que la ventana que empieza el primer día también
+        # sea una resta
+        posicion = codigo_par * self.dias + dia
+        celdas = len(claves) * self.dias
+        if es_cubo(datos):
+            cantidad, bruto = datos['unidades'].to_numpy(), datos['bruto'].to_numpy()
+        else:
+            cantidad = datos['Cantidad Vendida Actual'].to_numpy()
+            bruto = cantidad * datos['Precio'].to_numpy()
+        unidades = np.bincount(posicion, weights=cantidad, minlength=celdas).reshape(len(claves), self.dias)
+        if pd.api.types.is_integer_dtype(cantidad):
+            unidades = unidades.round().astype(np.int64)
+        ventas = np.bincount(posicion, weights=bruto, minlength=celdas).reshape(len(claves), self.dias)
+        self._unidades = self._acumular(unidades)
+        self._bruto = self._acumular(ventas)
+
+    @staticmethod
+    def _acumular(matriz):
+        acumulado = np.zeros((matriz.shape[0], matriz.shape[1] + 1), dtype=matriz.dtype)
+        np.cumsum(matriz, axis=1, out=acumulado[:, 1:])
+        return acumulado
+
+    def _posicion(self, fecha):
+        return min(max((pd.Timestamp(fecha).normalize() - self.primer_dia).days, 0), self.dias)
+
+    def sumar(self, inicio, fin, banners, productos):
+        """Unidades y ventas brutas por producto entre ``inicio`` y ``fin`` (inclusive)."""
+        desde, hasta = self._posicion(inicio), self._posicion(pd.Timestamp(fin) + pd.Timedelta(days=1))
+        seleccion = np.flatnonzero(self.banner_par.isin(banners) & self.producto_par.isin(productos))
+        if hasta <= desde:
+            seleccion = seleccion[:0]
+        totales = pd.DataFrame({
+            'unidades': self._unidades[seleccion, hasta] - self._unidades[seleccion, desde],
+            'bruto': self._bruto[seleccion, hasta] - self._bruto[seleccion, desde],
+        }, index=self.producto_par[seleccion])
+        return totales.groupby(level=0).sum()
+
+
+class IndiceFechas:
+    """Filas de cada día en un dataset ordenado por Date (filas sin fecha al final)."""
+
+    def __init__(self, fechas):
+        valores = fechas.to_numpy(dtype='datetime64[ns]')
+        validas = len(valores) - int(np.isnat(valores).sum())
+        valores = valores[:validas]
+        # Un día empieza donde cambia la fecha respecto de la fila anterior
+        self.inicios = np.flatnonzero(np.r_[True, valores[1:] != valores[:-1]]) if validas else np.empty(0, np.intp)
+        self.finales = np.append(self.inicios[1:], validas) if validas else self.inicios
+        self.dias = valores[self.inicios]
+
+    @staticmethod
+    def aplica(fechas):
+        # El índice sólo sirve si las fechas están ordenadas y las vacías van al final
+        validas = int(fechas.notna().sum())
+        return fechas.iloc[validas:].isna().all() and fechas.iloc[:validas].is_monotonic_increasing
+
+    def rangos(self, fechas):
+        """Cortes (inicio, fin) de filas que cubren ``fechas``; los días seguidos se unen."""
+        buscadas = np.unique(pd.DatetimeIndex(fechas).dropna().normalize().to_numpy(dtype='datetime64[ns]'))
+        posicion = np.searchsorted(self.dias, buscadas)
+        encontradas = posicion < len(self.dias)
+        encontradas[encontradas] = self.dias[posicion[encontradas]] == buscadas[encontradas]
+        posicion = posicion[encontradas]
+        if not len(posicion):
+            return []
+        # Días consecutivos en el dataset forman un solo corte
+        cortes = np.flatnonzero(np.diff(posicion) != 1) + 1
+        primeros = posicion[np.r_[0, cortes]]
+        ultimos = posicion[np.r_[cortes - 1, len(posicion) - 1]]
+        return list(zip(self.inicios[primeros].tolist(), self.finales[ultimos].tolist()))
+
+    def filas(self, fechas):
+        """Posiciones de las filas cuyas fechas están en ``fechas``."""
+        rangos = self.rangos(fechas)
+        if not rangos:
+            return np.empty(0, np.int64)
+        return np.concatenate([np.arange(inicio, fin) for inicio, fin in rangos])
+
+
+# Un índice por versión del dataset (filas o cubo), compartido por todas las sesiones
+@st.cache_resource(show_spinner=False, max_entries=2)
+@medida("indices")
+def _indice_compartido(_df, version, cubo):
+    return registrar(f"índice acumulado {version}", IndiceAcumulado(_df))
+
+
+def indice_ventas(df):
+    return _indice_compartido(df, version_datos(df), es_cubo(df))
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+@medida("indices")
+def _indice_fechas_compartido(_df, version, cubo):
+    indice = IndiceFechas(_df['Date']) if IndiceFechas.aplica(_df['Date']) else None
+    return registrar(f"índice de fechas {version}", indice)
+
+
+def indice_fechas(df):
+    """IndiceFechas de ``df``, o None si el dataset no está ordenado por fecha."""
+    return _indice_fechas_compartido(df, version_datos(df), es_cubo(df))
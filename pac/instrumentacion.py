@@ -0,0 +1,198 @@
+"""Tiempos por fase de cada página: carga, filtro, agregación y dibujo.
+
+Con ``PAC_INSTRUMENTACION=1`` las funciones marcadas con ``medida`` y los
+bloques ``fase`` anotan su duración. Cada página corre dentro de ``pagina``:
+al terminar agrega una línea al registro JSONL con la sesión, la página, la
+versión del dataset y sus fases, y si la URL trae ``?debug=1`` muestra los
+tiempos en la barra lateral. Lo que corre fuera de una página (la precarga, las
+recargas del libro) se registra igual, sin sesión.
+
+Desactivada, ``medida`` devuelve la función original y ``fase`` un contexto
+vacío, así que no agrega costo.
+"""
+import contextlib
+import functools
+import json
+import logging
+import os
+import threading
+import time
+
+import pandas as pd # type: ignore
+import streamlit as st # type: ignore
+from streamlit.runtime.scriptrunner import get_script_run_ctx # type: ignore
+
+from pac import memoria, perfilador
+
+logger = logging.getLogger(__name__)
+
+ACTIVA = os.environ.get("PAC_INSTRUMENTACION", "") not in ("", "0")
+
+# Archivo JSONL con una línea por ejecución; por omisión, junto a la caché de los datos
+RUTA_REGISTRO = os.environ.get("PAC_REGISTRO_FASES")
+
+# Parámetro de la URL que muestra el panel de tiempos
+PARAMETRO_PANEL = "debug"
+
+_NULO = contextlib.nullcontext()
+_actual = threading.local()
+_escritura = threading.Lock()
+
+
+class Registro:
+    """Fases de una ejecución de página (o de un trabajo en segundo plano)."""
+
+    def __init__(self, pagina=None, sesion=None):
+        self.pagina = pagina
+        self.sesion = sesion
+        self.hilo = threading.current_thread().name
+        self.fecha = pd.Timestamp.now().isoformat(timespec="seconds")
+        self.datos = {}
+        self.fases = []
+        self.nivel = 0
+        self.error = None
+        self.duracion = None
+        self._inicio = time.perf_counter()
+
+    def terminar(self):
+        self.duracion = time.perf_counter() - self._inicio
+
+    def sin_medir(self):
+        """Tiempo de la página fuera de las fases de primer nivel."""
+        return max(self.duracion - sum(f["duracion"] for f in self.fases if f["nivel"] == 0), 0.0)
+
+    def como_dict(self):
+        return {
+            "fecha": self.fecha,
+            "sesion": self.sesion,
+            "pagina": self.pagina,
+            "hilo": self.hilo,
+            **self.datos,
+            "duracion": self.duracion,
+            "error": self.error,
+            "fases": self.fases,
+        }
+
+
+def _ruta_registro():
+    if RUTA_REGISTRO:
+        return RUTA_REGISTRO
+    # Importar aquí evita un ciclo: pac.datos usa este módulo
+    from pac.datos import DIRECTORIO_CACHE
+    return os.path.join(DIRECTORIO_CACHE, "fases.jsonl")
+
+
+def _escribir(registro):
+    try:
+        ruta = _ruta_registro()
+        linea = json.dumps(registro.como_dict(), ensure_ascii=False, default=str) + "\n"
+        with _escritura:
+            os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+            with open(ruta, "a", encoding="utf-8") as archivo:
+                archivo.write(linea)
+    except Exception as e:
+        logger.warning("No se pudo escribir el registro de fases: %s", e)
+
+
+@contextlib.contextmanager
+def _fase(nombre):
+    registro = getattr(_actual, "registro", None)
+    propio = registro is None
+    if propio:
+        # Fuera de una página la fase más externa forma su propio registro
+        registro = _actual.registro = Registro()
+    entrada = {"fase": nombre, "nivel": registro.nivel, "inicio": time.perf_counter() - registro._inicio}
+    registro.fases.append(entrada)
+    registro.nivel += 1
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        entrada["duracion"] = time.perf_counter() - inicio
+        registro.nivel -= 1
+        if propio:
+            _actual.registro = None
+            registro.terminar()
+            _escribir(registro)
+
+
+def fase(nombre):
+    """Contexto que mide el bloque como la fase ``nombre`` de la ejecución en curso."""
+    return _fase(nombre) if ACTIVA else _NULO
+
+
+def medida(nombre):
+    """Decorador que mide cada llamada a la función como la fase ``nombre``."""
+    def decorar(funcion):
+        if not ACTIVA:
+            return funcion
+
+        @functools.wraps(funcion)
+        def medir(*args, **kwargs):
+            with _fase(nombre):
+                return funcion(*args, **kwargs)
+        return medir
+    return decorar
+
+
+def anotar(**datos):
+    """Agrega datos (por ejemplo la versión del dataset) al registro en curso."""
+    registro = getattr(_actual, "registro", None) if ACTIVA else None
+    if registro is not None:
+        registro.datos.update(datos)
+
+
+@contextlib.contextmanager
+def _registrar(nombre):
+    contexto = get_script_run_ctx()
+    registro = _actual.registro = Registro(pagina=nombre, sesion=contexto.session_id if contexto else None)
+    try:
+        yield registro
+    except BaseException as e:
+        # Incluye st.stop() y los reruns, que también cortan la ejecución
+        registro.error = type(e).__name__
+        raise
+    finally:
+        _actual.registro = None
+        registro.terminar()
+        _escribir(registro)
+        if registro.error is None and st.query_params.get(PARAMETRO_PANEL) == "1":
+            mostrar_panel(registro)
+
+
+@contextlib.contextmanager
+def _pagina(ruta):
+    nombre = os.path.splitext(os.path.basename(ruta))[0]
+    with contextlib.ExitStack() as contextos:
+        # El perfil envuelve al registro para que su tabla quede al final de la página
+        if perfilador.pedido():
+            contextos.enter_context(perfilador.perfilar(nombre))
+        if ACTIVA:
+            contextos.enter_context(_registrar(nombre))
+        # Dentro del registro, para que la memoria quede anotada en él
+        if ACTIVA or memoria.VIGILANCIA:
+            contextos.enter_context(memoria.vigilar(nombre, ruta))
+        yield
+
+
+def pagina(ruta):
+    """Contexto que envuelve la ejecución de la página ``ruta`` (su ``__file__``).
+
+    Anota las fases si la instrumentación está activa, perfila la ejecución si
+    se pide con ``?profile=1`` (ver ``pac.perfilador``) y vigila la memoria
+    (ver ``pac.memoria``).
+    """
+    return _pagina(ruta) if ACTIVA or perfilador.HABILITADO or memoria.VIGILANCIA else _NULO
+
+
+def mostrar_panel(registro):
+    """Tiempos de la ejecución en la barra lateral."""
+    filas = [
+        {"Fase": " " * f["nivel"] + f["fase"], "Inicio (ms)": 1000 * f["inicio"], "Duración (ms)": 1000 * f["duracion"]}
+        for f in registro.fases
+    ]
+    filas.append({"Fase": "sin medir", "Inicio (ms)": None, "Duración (ms)": 1000 * registro.sin_medir()})
+    with st.sidebar.expander("Tiempos de la página", expanded=True):
+        st.caption(f"Sesión {registro.sesion or '-'} · versión {registro.datos.get('version', '-')}")
+        st.metric("Total", f"{1000 * registro.duracion:,.0f} ms")
+        st.dataframe(pd.DataFrame(filas).round(1), hide_index=True, use_container_width=True)
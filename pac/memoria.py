@@ -0,0 +1,265 @@
+"""Memoria del proceso, de los datos compartidos y de cada página.
+
+Los datos que comparte el proceso (cubo, índices y resultados) se
+anotan con ``registrar`` al construirse; el registro guarda referencias
+débiles, así que lo que la caché descarta deja de contarse. Cada página corre
+dentro de ``vigilar`` (desde ``pac.instrumentacion.pagina``), que mide la
+memoria residente antes y después de la ejecución:
+
+- con ``PAC_MEMORIA_PRESUPUESTO_MB`` se avisa en el log qué página llevó el
+  proceso por encima de ese presupuesto;
+- con ``PAC_MEMORIA=1`` y ``?memoria=1`` en la URL la barra lateral muestra el
+  tamaño de los datos compartidos, de las variables de la página (sin contar
+  lo que comparten con los datos del proceso) y del estado de la sesión;
+  ``?tracemalloc=1`` agrega las líneas que más memoria reservaron desde la
+  instantánea anterior (``?tracemalloc=0`` detiene el seguimiento).
+"""
+import contextlib
+import logging
+import os
+import sys
+import threading
+import tracemalloc
+import weakref
+
+import numpy as np # type: ignore
+import pandas as pd # type: ignore
+import streamlit as st # type: ignore
+from streamlit.runtime.scriptrunner import get_script_run_ctx # type: ignore
+
+logger = logging.getLogger(__name__)
+
+HABILITADO = os.environ.get("PAC_MEMORIA", "") not in ("", "0")
+
+
+def _presupuesto():
+    # Un valor mal escrito no debe impedir que carguen las páginas
+    valor = os.environ.get("PAC_MEMORIA_PRESUPUESTO_MB", "").strip()
+    if not valor:
+        return None
+    try:
+        return float(valor)
+    except ValueError:
+        logger.warning("PAC_MEMORIA_PRESUPUESTO_MB debe ser un número de MB, no '%s'; se ignora", valor)
+        return None
+
+
+PRESUPUESTO_MB = _presupuesto()
+VIGILANCIA = HABILITADO or PRESUPUESTO_MB is not None
+
+# Parámetros de la URL que muestran el panel y controlan tracemalloc
+PARAMETRO = "memoria"
+PARAMETRO_TRACEMALLOC = "tracemalloc"
+
+# Líneas de tracemalloc que se muestran
+LINEAS_TRACEMALLOC = 15
+
+_compartidos = weakref.WeakValueDictionary()
+_guardia = threading.Lock()
+_ultima_instantanea = None
+
+MB = 2**20
+
+
+def rss_mb():
+    """Memoria residente del proceso en MB, o None si no se puede leer."""
+    try:
+        with open("/proc/self/statm") as archivo:
+            return int(archivo.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / MB
+    except (OSError, ValueError, AttributeError):
+        return pico_mb()
+
+
+def pico_mb():
+    """Máximo de memoria residente que alcanzó el proceso, en MB, o None."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    maximo = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux lo informa en KB y macOS en bytes
+    return maximo / MB if sys.platform == "darwin" else maximo / 1024
+
+
+def registrar(nombre, objeto):
+    """Anota ``objeto`` como dato compartido del proceso y lo devuelve."""
+    if objeto is not None:
+        with _guardia:
+            _compartidos[nombre] = objeto
+    return objeto
+
+
+def _arreglos(objeto, profundidad=3):
+    # Arreglos de numpy de un objeto de datos, con el tamaño que ocupa cada uno
+    if isinstance(objeto, pd.DataFrame):
+        for posicion in range(objeto.shape[1]):
+            yield from _arreglos(objeto.iloc[:, posicion], profundidad)
+    elif isinstance(objeto, pd.Series):
+        arreglo = objeto.array
+        if isinstance(arreglo, pd.Categorical):
+            yield arreglo.codes, arreglo.codes.nbytes + arreglo.categories.memory_usage(deep=True)
+        else:
+            valores = np.asarray(arreglo)
+            yield valores, objeto.memory_usage(deep=True, index=False)
+    elif isinstance(objeto, np.ndarray):
+        yield objeto, objeto.nbytes
+    elif isinstance(objeto, pd.Index):
+        yield np.asarray(objeto), objeto.memory_usage(deep=True)
+    elif profundidad <= 0:
+        return
+    elif isinstance(objeto, dict):
+        for valor in objeto.values():
+            yield from _arreglos(valor, profundidad - 1)
+    elif isinstance(objeto, (list, tuple)):
+        for valor in objeto:
+            yield from _arreglos(valor, profundidad - 1)
+    elif hasattr(objeto, "__dict__") and not callable(objeto):
+        # Clases propias (Resultado, índices, Refrescador): mirar sus atributos
+        for valor in vars(objeto).values():
+            yield from _arreglos(valor, profundidad - 1)
+
+
+def _direccion(arreglo):
+    # Dirección de los datos; las vistas de un mismo bloque comparten la base
+    base = arreglo
+    while isinstance(base, np.ndarray) and base.base is not None and isinstance(base.base, np.ndarray):
+        base = base.base
+    return base.__array_interface__["data"][0] if isinstance(base, np.ndarray) else id(base)
+
+
+def tamano(objeto, excluir=frozenset()):
+    """Bytes de los datos de ``objeto`` (columnas, arreglos, resultados), sin los de ``excluir``.
+
+    ``excluir`` son direcciones de arreglos (ver ``direcciones``); sirve para no
+    contar las columnas que una página comparte con el cubo del proceso.
+    """
+    vistos, total = set(), 0
+    for arreglo, bytes_ in _arreglos(objeto):
+        direccion = _direccion(arreglo)
+        if direccion in excluir or direccion in vistos:
+            continue
+        vistos.add(direccion)
+        total += bytes_
+    return total
+
+
+def direcciones(objetos):
+    return {_direccion(arreglo) for objeto in objetos for arreglo, _ in _arreglos(objeto)}
+
+
+def compartidos():
+    """Datos compartidos vivos del proceso: nombre -> objeto."""
+    with _guardia:
+        return dict(_compartidos.items())
+
+
+def _variables_de_pagina(ruta):
+    # Variables globales del script de la página que está corriendo
+    marco = sys._getframe()
+    while marco is not None and marco.f_code.co_filename != ruta:
+        marco = marco.f_back
+    if marco is None:
+        return {}
+    return {
+        nombre: valor for nombre, valor in marco.f_globals.items()
+        if not nombre.startswith("_")
+        and (isinstance(valor, (pd.DataFrame, pd.Series, np.ndarray, dict, list, tuple)) or type(valor).__name__ == "Resultado")
+    }
+
+
+def informe(ruta=None):
+    """Tablas de memoria: datos compartidos, variables de la página y estado de la sesión."""
+    datos = compartidos()
+    excluir = direcciones(datos.values())
+    tabla_compartidos = pd.DataFrame(
+        [{"Dato": nombre, "MB": tamano(objeto) / MB} for nombre, objeto in datos.items()], columns=["Dato", "MB"])
+    tabla_pagina = pd.DataFrame([
+        {"Variable": nombre, "Tipo": type(valor).__name__, "MB propios": tamano(valor, excluir) / MB,
+         "MB compartidos": (tamano(valor) - tamano(valor, excluir)) / MB}
+        for nombre, valor in (_variables_de_pagina(ruta) if ruta else {}).items()
+    ], columns=["Variable", "Tipo", "MB propios", "MB compartidos"])
+    tabla_sesion = pd.DataFrame([
+        {"Clave": str(clave), "MB": tamano(valor, excluir) / MB, "Tipo": type(valor).__name__}
+        for clave, valor in st.session_state.to_dict().items()
+    ], columns=["Clave", "MB", "Tipo"])
+    return tabla_compartidos, tabla_pagina, tabla_sesion
+
+
+def _tracemalloc():
+    # Líneas con más memoria reservada desde la instantánea anterior del proceso
+    global _ultima_instantanea
+    pedido = st.query_params.get(PARAMETRO_TRACEMALLOC)
+    if pedido == "0":
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        _ultima_instantanea = None
+        return None
+    if pedido != "1":
+        return None
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+    instantanea = tracemalloc.take_snapshot().filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+    ])
+    anterior, _ultima_instantanea = _ultima_instantanea, instantanea
+    if anterior is None:
+        estadisticas = [(e.traceback[0], e.size, e.size) for e in instantanea.statistics("lineno")]
+    else:
+        estadisticas = [(e.traceback[0], e.size, e.size_diff) for e in instantanea.compare_to(anterior, "lineno")]
+    estadisticas.sort(key=lambda e: e[2], reverse=True)
+    return pd.DataFrame([
+        {"Línea": f"{os.path.basename(marco.filename)}:{marco.lineno}", "MB": tamano_ / MB, "Cambio (MB)": cambio / MB}
+        for marco, tamano_, cambio in estadisticas[:LINEAS_TRACEMALLOC]
+    ], columns=["Línea", "MB", "Cambio (MB)"])
+
+
+def mostrar_panel(ruta):
+    tabla_compartidos, tabla_pagina, tabla_sesion = informe(ruta)
+    lineas = _tracemalloc()
+    rss, pico = rss_mb(), pico_mb()
+    with st.sidebar.expander("Memoria", expanded=True):
+        st.metric("Memoria del proceso", f"{rss:,.0f} MB" if rss is not None else "-",
+                  help=f"Pico {pico:,.0f} MB" if pico is not None else None)
+        if PRESUPUESTO_MB is not None:
+            st.caption(f"Presupuesto {PRESUPUESTO_MB:,.0f} MB")
+        st.caption("Compartido por todas las sesiones")
+        st.dataframe(tabla_compartidos.round(2), hide_index=True, use_container_width=True)
+        st.caption("Variables de esta página")
+        st.dataframe(tabla_pagina.round(2), hide_index=True, use_container_width=True)
+        st.caption("Estado de la sesión")
+        st.dataframe(tabla_sesion.round(2), hide_index=True, use_container_width=True)
+        if lineas is not None:
+            st.caption("tracemalloc: líneas con más memoria desde la instantánea anterior")
+            st.dataframe(lineas.round(3), hide_index=True, use_container_width=True)
+
+
+def _avisar_presupuesto(nombre, antes, despues, pico_antes, pico_despues):
+    if PRESUPUESTO_MB is None or despues is None:
+        return
+    cruzo = antes is not None and antes <= PRESUPUESTO_MB < despues
+    nuevo_pico = pico_antes is not None and pico_despues is not None and pico_antes <= PRESUPUESTO_MB < pico_despues
+    if cruzo or nuevo_pico:
+        contexto = get_script_run_ctx()
+        logger.warning(
+            "La página %s (sesión %s) llevó la memoria del proceso por encima del presupuesto de %.0f MB: "
+            "%.0f MB (%+.0f MB en esta ejecución, pico %s MB)",
+            nombre, contexto.session_id if contexto else "-", PRESUPUESTO_MB, despues,
+            despues - (antes or 0), f"{pico_despues:.0f}" if pico_despues is not None else "-",
+        )
+
+
+@contextlib.contextmanager
+def vigilar(nombre, ruta):
+    """Mide la memoria de la ejecución de una página y avisa si supera el presupuesto."""
+    from pac.instrumentacion import anotar  # importar aquí evita un ciclo
+    antes, pico_antes = rss_mb(), pico_mb()
+    try:
+        yield
+    finally:
+        # También cuando la página se corta (st.stop, errores): puede ser la que agotó la memoria
+        despues, pico_despues = rss_mb(), pico_mb()
+        anotar(rss_mb=despues, rss_cambio_mb=None if antes is None or despues is None else despues - antes)
+        _avisar_presupuesto(nombre, antes, despues, pico_antes, pico_despues)
+    if HABILITADO and st.query_params.get(PARAMETRO) == "1":
+        mostrar_panel(ruta)
@@ -0,0 +1,71 @@
+"""Perfil de una ejecución de página con cProfile, a pedido desde la URL.
+
+Con ``PAC_PERFILADOR=1`` en el entorno, agregar ``?profile=1`` a la URL de
+cualquier página ejecuta esa corrida bajo cProfile y muestra al final las
+funciones con más tiempo acumulado, junto con el archivo ``.prof`` para
+descargar (se abre con snakeviz o se convierte en flamegraph con flameprof).
+Sin la variable el parámetro se ignora, así que no se puede activar desde
+afuera en un servidor que no la tenga.
+"""
+import contextlib
+import cProfile
+import marshal
+import os
+import pstats
+
+import pandas as pd # type: ignore
+import streamlit as st # type: ignore
+
+HABILITADO = os.environ.get("PAC_PERFILADOR", "") not in ("", "0")
+
+# Parámetro de la URL que pide el perfil
+PARAMETRO = "profile"
+
+# Funciones que se muestran en la tabla
+FUNCIONES_MOSTRADAS = 30
+
+
+def pedido():
+    """True si el entorno lo permite y la URL pide perfilar esta ejecución."""
+    return HABILITADO and st.query_params.get(PARAMETRO) == "1"
+
+
+@contextlib.contextmanager
+def perfilar(nombre):
+    """Perfila el bloque y, si termina sin errores, muestra el resultado."""
+    perfil = cProfile.Profile()
+    try:
+        perfil.enable()
+    except ValueError:
+        # Otra sesión tiene el perfilador tomado (en Python 3.12+ es uno por proceso)
+        st.warning("Hay otro perfil en curso; esta ejecución no se perfila.")
+        yield None
+        return
+    try:
+        yield perfil
+    finally:
+        perfil.disable()
+    mostrar_perfil(perfil, nombre)
+
+
+def mostrar_perfil(perfil, nombre):
+    estadisticas = pstats.Stats(perfil)
+    funciones = pd.DataFrame([
+        {
+            "Función": funcion,
+            "Ubicación": f"{os.path.basename(archivo)}:{linea}",
+            "Llamadas": llamadas,
+            "Tiempo propio (s)": propio,
+            "Tiempo acumulado (s)": acumulado,
+        }
+        for (archivo, linea, funcion), (_, llamadas, propio, acumulado, _) in estadisticas.stats.items()
+    ])
+    with st.expander("Perfil de la ejecución", expanded=True):
+        st.caption(f"{estadisticas.total_calls:,} llamadas en {estadisticas.total_tt:.2f} s")
+        st.dataframe(funciones.nlargest(FUNCIONES_MOSTRADAS, "Tiempo acumulado (s)").round(4),
+                     hide_index=True, use_container_width=True)
+        # Mismo formato que Profile.dump_stats
+        st.download_button(
+            "Descargar perfil (.prof)", marshal.dumps(estadisticas.stats),
+            file_name=f"{nombre}_{pd.Timestamp.now():%Y%m%d_%H%M%S}.prof", mime="application/octet-stream",
+        )
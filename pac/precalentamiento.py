@@ -0,0 +1,87 @@
+"""Precarga de datos y actividades al arrancar la aplicación.
+
+La página principal inicia, una sola vez por proceso, un hilo que carga el cubo
+diario y calcula todas las actividades. Así la primera visita a cada página
+encuentra los cálculos hechos en lugar de pagar la lectura del Excel.
+"""
+import logging
+import threading
+import time
+
+import streamlit as st # type: ignore
+
+from pac.campanas import resultados_todas
+from pac.datos import cubo_actual
+from pac.instrumentacion import medida
+
+logger = logging.getLogger(__name__)
+
+
+class Precalentamiento:
+    def __init__(self):
+        self.estado = "pendiente"
+        self.error = None
+        self.inicio = time.monotonic()
+        self.fin = None
+
+    @property
+    def terminado(self):
+        return self.fin is not None
+
+    @property
+    def listo(self):
+        return self.terminado and self.error is None
+
+    @property
+    def duracion(self):
+        return (self.fin or time.monotonic()) - self.inicio
+
+    @medida("precalentamiento")
+    def ejecutar(self):
+        try:
+            self.estado = "cargando datos"
+            cubo = cubo_actual()
+            self.estado = "calculando actividades"
+            resultados_todas(cubo)
+            self.estado = "listo"
+        except Exception as e:
+            self.estado = "error"
+            self.error = e
+            logger.warning("No se pudieron precargar los datos: %s", e)
+        finally:
+            self.fin = time.monotonic()
+
+
+# Una sola precarga por proceso, iniciada por la primera sesión que abre la página principal
+@st.cache_resource(show_spinner=False)
+def precalentar():
+    precalentamiento = Precalentamiento()
+    threading.Thread(target=precalentamiento.ejecutar, name="pac-precalentamiento", daemon=True).start()
+    return precalentamiento
+
+
+def mostrar_estado(precalentamiento):
+    """Indicador de disponibilidad que se actualiza solo hasta que termina la precarga.
+
+    Una precarga fallida se saca de la caché: la próxima visita a la página
+    principal la vuelve a intentar.
+    """
+    terminado = precalentamiento.terminado
+    if terminado and precalentamiento.error is not None:
+        precalentar.clear()
+
+    @st.fragment(run_every=None if terminado else 1)
+    def indicador():
+        if precalentamiento.listo:
+            st.success(f"Datos y actividades listos ({precalentamiento.duracion:.1f} s)")
+        elif precalentamiento.terminado:
+            st.warning(f"No se pudieron precargar los datos: {precalentamiento.error}. "
+                       "Se volverá a intentar al recargar la página.")
+        else:
+            st.info(f"Preparando datos: {precalentamiento.estado}...")
+        if precalentamiento.terminado and not terminado:
+            # Rerun completo para dejar de consultar el estado cada segundo (y,
+            # si falló, sacarla de la caché)
+            st.rerun()
+
+    indicador()
@@ -0,0 +1,99 @@
+"""Recarga en segundo plano cuando cambia el libro de ventas.
+
+Un Refrescador mantiene el último valor cargado desde un archivo y vigila ese
+archivo con watchdog. Cuando el archivo cambia, espera a que deje de cambiar,
+reconstruye el valor en un hilo aparte y recién entonces lo reemplaza: quien
+pide los datos mientras tanto recibe la versión anterior, nunca espera la
+reconstrucción.
+"""
+import logging
+import os
+import threading
+
+from watchdog.events import FileSystemEventHandler # type: ignore
+from watchdog.observers import Observer # type: ignore
+
+from pac.instrumentacion import fase
+
+logger = logging.getLogger(__name__)
+
+# Segundos sin cambios antes de reconstruir (copiar un libro grande genera varios eventos)
+ESPERA_SEGUNDOS = 2.0
+
+# Funciones que se llaman con cada valor nuevo antes de publicarlo, para dejar
+# listos los cálculos derivados
+CALENTADORES = []
+
+
+def registrar_calentador(funcion):
+    if funcion not in CALENTADORES:
+        CALENTADORES.append(funcion)
+    return funcion
+
+
+class _Vigilante(FileSystemEventHandler):
+    def __init__(self, ruta, avisar):
+        self.ruta = ruta
+        self.avisar = avisar
+
+    def on_any_event(self, event):
+        if event.event_type not in ("created", "modified", "moved"):
+            return
+        rutas = (event.src_path, getattr(event, "dest_path", ""))
+        if any(ruta and os.path.abspath(ruta) == self.ruta for ruta in rutas):
+            self.avisar()
+
+
+class Refrescador:
+    def __init__(self, ruta, cargar, espera=ESPERA_SEGUNDOS):
+        self.ruta = os.path.abspath(ruta)
+        self.espera = espera
+        self._cargar = cargar
+        self._cambio = threading.Event()
+        # La primera carga es sincrónica: todavía no hay versión anterior que mostrar
+        self._valor = cargar()
+        self.reconstruyendo = False
+        self.error = None
+        threading.Thread(target=self._trabajar, name="pac-refresco", daemon=True).start()
+        self._observador = self._vigilar()
+
+    def _vigilar(self):
+        try:
+            observador = Observer()
+            observador.daemon = True
+            observador.schedule(_Vigilante(self.ruta, self._cambio.set), os.path.dirname(self.ruta), recursive=False)
+            observador.start()
+            return observador
+        except Exception as e:
+            # Sin vigilancia los datos se siguen sirviendo, sólo que no se recargan solos
+            logger.warning("No se pudo vigilar %s: %s", self.ruta, e)
+            return None
+
+    def actual(self):
+        """Último valor publicado (el anterior mientras se reconstruye uno nuevo)."""
+        return self._valor
+
+    def _trabajar(self):
+        while True:
+            self._cambio.wait()
+            # Esperar a que el archivo deje de cambiar
+            while True:
+                self._cambio.clear()
+                if not self._cambio.wait(self.espera):
+                    break
+            self.reconstruyendo = True
+            try:
+                with fase("recarga"):
+                    nuevo = self._cargar()
+                    for calentar in CALENTADORES:
+                        calentar(nuevo)
+            except Exception as e:
+                # Se sigue sirviendo la versión anterior; el próximo cambio lo reintenta
+                self.error = e
+                logger.warning("No se pudo recargar %s: %s", self.ruta, e)
+            else:
+                # Reemplazar la referencia es atómico: cada lector ve la versión vieja o la nueva
+                self._valor = nuevo
+                self.error = None
+            finally:
+                self.reconstruyendo = False
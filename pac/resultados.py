@@ -0,0 +1,137 @@
+"""Resultados de las actividades guardados en disco.
+
+Cada resultado se guarda con una clave formada por la actividad, la versión del
+dataset (hash del libro), la huella de su definición y la versión del cálculo
+(``VERSION_RESULTADOS``). Así el resumen y las páginas se sirven desde disco,
+y al cambiar el libro o un TOML sólo se recalculan las actividades afectadas.
+
+Cada resultado es un único archivo Arrow IPC sin comprimir: la tabla de
+utilidad en las columnas y los KPIs en los metadatos del esquema. Se escribe
+de forma atómica y se lee con un mapeo de memoria, así que varias réplicas en
+el mismo servidor comparten los resultados sin recalcularlos; un archivo de
+bloqueo por resultado hace que sólo una réplica lo calcule.
+"""
+import glob
+import json
+import logging
+import os
+from dataclasses import dataclass
+
+import numpy as np # type: ignore
+import pandas as pd # type: ignore
+import pyarrow as pa # type: ignore
+
+from pac.concurrencia import Cerrojos
+from pac.datos import DIRECTORIO_CACHE, _escribir_atomico
+from pac.instrumentacion import medida
+
+logger = logging.getLogger(__name__)
+
+# Carpeta con los resultados calculados
+DIRECTORIO_RESULTADOS = os.path.join(DIRECTORIO_CACHE, "resultados")
+
+# Versiones guardadas por actividad; las más antiguas se borran
+VERSIONES_POR_CAMPANA = 3
+
+# Versión del cálculo y del formato de los resultados. Forma parte de la clave,
+# así que hay que subirla al cambiar evaluar_campanas, _armar_resultado, los
+# KPIs o la forma de guardarlos: si no, se siguen sirviendo los de disco
+VERSION_RESULTADOS = 2
+
+# Clave de los metadatos del esquema donde van los KPIs
+METADATO_KPIS = b"pac.kpis"
+
+# Evaluaciones en curso por actividad, versión y huella, entre hilos y procesos
+_EN_CURSO = Cerrojos(archivo=lambda base: base + ".lock")
+
+
+@dataclass
+class Resultado:
+    kpis: dict
+    utilidad_df: pd.DataFrame
+
+
+def _base(campana, version, directorio):
+    return os.path.join(directorio, f"{campana.identificador}__{version}__{campana.huella}__r{VERSION_RESULTADOS}")
+
+
+def _a_json(valor):
+    # Los KPIs salen de pandas como escalares de numpy
+    return valor.item() if isinstance(valor, np.generic) else valor
+
+
+def leer_resultado(campana, version, directorio=DIRECTORIO_RESULTADOS):
+    try:
+        with pa.memory_map(_base(campana, version, directorio) + ".arrow") as fuente:
+            tabla = pa.ipc.open_file(fuente).read_all()
+        kpis = json.loads(tabla.schema.metadata[METADATO_KPIS])
+    except (OSError, ValueError, KeyError, pa.ArrowInvalid):
+        return None
+    return Resultado(kpis=kpis, utilidad_df=tabla.to_pandas())
+
+
+def guardar_resultado(campana, version, resultado, directorio=DIRECTORIO_RESULTADOS):
+    tabla = pa.Table.from_pandas(resultado.utilidad_df, preserve_index=False)
+    kpis = json.dumps({clave: _a_json(valor) for clave, valor in resultado.kpis.items()})
+    tabla = tabla.replace_schema_metadata({**(tabla.schema.metadata or {}), METADATO_KPIS: kpis.encode("utf-8")})
+
+    def escribir(ruta):
+        with pa.OSFile(ruta, "wb") as destino, pa.ipc.new_file(destino, tabla.schema) as escritor:
+            escritor.write_table(tabla)
+    try:
+        os.makedirs(directorio, exist_ok=True)
+        _escribir_atomico(_base(campana, version, directorio) + ".arrow", escribir)
+        _podar(campana, directorio)
+    except Exception as e:
+        logger.warning("No se pudo guardar el resultado de %s: %s", campana.identificador, e)
+
+
+def _podar(campana, directorio):
+    # Agrupar los archivos de cada versión (resultado y bloqueo) y conservar las más recientes
+    versiones = {}
+    for ruta in glob.glob(os.path.join(glob.escape(directorio), f"{glob.escape(campana.identificador)}__*")):
+        versiones.setdefault(os.path.splitext(ruta)[0], []).append(ruta)
+    recientes = sorted(versiones, key=lambda base: max(os.path.getmtime(ruta) for ruta in versiones[base]), reverse=True)
+    for base in recientes[VERSIONES_POR_CAMPANA:]:
+        for ruta in versiones[base]:
+            try:
+                os.remove(ruta)
+            except OSError:
+                pass
+
+
+@medida("resultados")
+def resultados_persistentes(campanas, version, evaluar, directorio=DIRECTORIO_RESULTADOS):
+    """Resultados de ``campanas`` para ``version``, leyendo de disco lo que ya exista.
+
+    ``evaluar`` recibe la lista de actividades que faltan y devuelve sus
+    resultados; se llama una sola vez con todas ellas. Si otra llamada (de este
+    u otro proceso) ya está evaluando alguna, se espera a que termine y se usa
+    lo que dejó en disco.
+    """
+    if version is None:
+        return evaluar(campanas)
+
+    resultados, faltantes = {}, []
+    for campana in campanas:
+        resultado = leer_resultado(campana, version, directorio)
+        if resultado is None:
+            faltantes.append(campana)
+        else:
+            resultados[campana.identificador] = resultado
+
+    if faltantes:
+        with _EN_CURSO.tomar(*(_base(campana, version, directorio) for campana in faltantes)):
+            pendientes = []
+            for campana in faltantes:
+                resultado = leer_resultado(campana, version, directorio)
+                if resultado is None:
+                    pendientes.append(campana)
+                else:
+                    resultados[campana.identificador] = resultado
+            if pendientes:
+                nuevos = evaluar(pendientes)
+                for campana in pendientes:
+                    guardar_resultado(campana, version, nuevos[campana.identificador], directorio)
+                resultados.update(nuevos)
+    return {campana.identificador: resultados[campana.identificador] for campana in campanas}
@@ -0,0 +1,218 @@
+"""Generador determinista de ventas sintéticas con el esquema de 'Análisis PAC'.
+
+Sirve para medir las páginas con 1M a 100M filas sin usar extractos reales.
+Los banners y los códigos de producto parten de una lista fija con los que usan
+las actividades de ``campanas/`` (y se completan con códigos del mismo estilo);
+no se leen de los TOML para que agregar o editar una actividad no cambie los
+datos generados. La popularidad de
+banners y productos sigue una ley de Zipf con sesgo configurable, los fines de
+semana venden más y cada producto tiene su precio base.
+
+Cada día se genera con su propia semilla, así que el resultado no depende del
+tamaño de bloque. ``VERSION_GENERADOR`` identifica la forma de generar: con la
+misma versión, los mismos parámetros y la misma semilla las filas son idénticas.
+Uso:
+
+    python -m pac.sintetico 1000000 ventas.parquet ventas.arrow --dias 730
+"""
+import argparse
+import logging
+import os
+
+import numpy as np # type: ignore
+import pandas as pd # type: ignore
+import pyarrow as pa # type: ignore
+import pyarrow.parquet as pq # type: ignore
+
+from pac.datos import COLUMNAS, HOJA
+
+logger = logging.getLogger(__name__)
+
+# Filas de datos que caben en una hoja de Excel (la primera es el encabezado)
+MAX_FILAS_EXCEL = 1_048_575
+
+# Peso de cada día de la semana (lunes a domingo)
+PESO_DIA_SEMANA = (0.85, 0.85, 0.9, 0.95, 1.15, 1.3, 1.0)
+
+# Versión del generador: hay que subirla al cambiar cualquier cosa que altere las
+# filas generadas (catálogos, pesos, distribuciones, uso de las semillas)
+VERSION_GENERADOR = 2
+
+# Banners y productos de las actividades de campanas/ al escribir el generador.
+# Es una copia fija a propósito: las actividades nuevas no cambian los datos
+BANNERS_BASE = (
+    "Carulla Express", "Éxito", "urtimax", "Super Inter", "Sao Olímpica", "Sto Olímpica", "Sdo Olímpica",
+    "Carulla", "Éxito Express", "Farmatodo",
+)
+SKUS_BASE = (
+    "CCBD90", "PBD100CC0", "MASR100", "5PPS0", "5PSLL0", "MALL100", "MABD100", "YSM100", "PCT100", "N140",
+    "8PCN0", "4PBARQ0", "NQC140JC0", "8PBS0", "PLL100", "PSR100", "CCSM90", "CCLL90", "8PCS0", "12P0",
+    "6PCT0", "6PSR0", "PAP100", "PCC100", "PSV100CC0", "6PBD0", "6PPL0", "PL25", "PSR25", "PSV25",
+    "PBD25", "PMP25", "PCC25", "YSM25", "PCT25", "PAP25", "BARQ0", "CDS14", "CQC14", "CSM14",
+    "BAC18", "BCDQ18", "BPA18",
+)
+
+# Banners adicionales a los de las actividades
+BANNERS_EXTRA = ("Surtimax", "Súper Inter", "Olímpica", "Jumbo", "Metro", "D1", "Ara", "Cruz Verde", "Locatel", "Makro")
+
+
+# Partes de los códigos sintéticos, con la forma de los reales: prefijo numérico,
+# "P", de una a tres letras, número y sufijo
+PREFIJOS = ("", "4", "6", "8", "12")
+LETRAS = tuple("ABCDLMNPQRSTVY")
+NUMEROS = ("0", "14", "18", "25", "90", "100", "140")
+SUFIJOS = ("", "0", "CC0", "JC0")
+
+
+def _codigos_sinteticos(cantidad, rng, excluir=()):
+    # Códigos distintos entre sí y de los de ``excluir``. El patrón admite unos
+    # 400 mil códigos: si se agota (o casi todo sale repetido) se completa con
+    # códigos correlativos "PZ<n>", que no chocan con él porque no usa la Z
+    vistos = set(excluir)
+    codigos = []
+    intentos = 0
+    while len(codigos) < cantidad and intentos < 2 * cantidad + 1000:
+        lote = max(cantidad - len(codigos), 256)
+        prefijos = rng.choice(PREFIJOS, lote)
+        largos = rng.integers(1, 4, lote)
+        letras = rng.choice(LETRAS, (lote, 3))
+        numeros = rng.choice(NUMEROS, lote)
+        sufijos = rng.choice(SUFIJOS, lote)
+        for prefijo, largo, fila, numero, sufijo in zip(prefijos, largos, letras, numeros, sufijos):
+            intentos += 1
+            codigo = prefijo + "P" + "".join(fila[:largo]) + numero + sufijo
+            if codigo not in vistos:
+                vistos.add(codigo)
+                codigos.append(codigo)
+                if len(codigos) == cantidad:
+                    break
+    correlativo = 0
+    while len(codigos) < cantidad:
+        codigo = f"PZ{correlativo}"
+        correlativo += 1
+        if codigo not in vistos:
+            vistos.add(codigo)
+            codigos.append(codigo)
+    return codigos
+
+
+def catalogo(banners=12, skus=200, semilla=0):
+    """Banners y productos con sus pesos de popularidad, precio base y unidades medias."""
+    rng = np.random.default_rng([semilla, 0])
+    reales_banners, reales_skus = list(BANNERS_BASE), list(SKUS_BASE)
+
+    nombres_banners = (reales_banners + [b for b in BANNERS_EXTRA if b not in reales_banners])[:banners]
+    while len(nombres_banners) < banners:
+        nombres_banners.append(f"Banner {len(nombres_banners) + 1}")
+    nombres_skus = reales_skus[:skus]
+    if len(nombres_skus) < skus:
+        nombres_skus += _codigos_sinteticos(skus - len(nombres_skus), rng, excluir=reales_skus)
+
+    return (
+        pd.DataFrame({'Banner': nombres_banners}),
+        pd.DataFrame({
+            'Código Homologado': nombres_skus,
+            # Precios en pesos, redondeados a la centena
+            'precio': np.round(np.exp(rng.normal(np.log(9000), 0.6, skus)), -2).clip(500),
+            'unidades': rng.gamma(2.0, 1.5, skus) + 0.5,
+        }),
+    )
+
+
+def _zipf(cantidad, sesgo, rng):
+    # Pesos de Zipf en un orden aleatorio, para que el más vendido no sea siempre el primero
+    pesos = 1.0 / np.arange(1, cantidad + 1) ** sesgo
+    return rng.permutation(pesos / pesos.sum())
+
+
+def generar(filas, dias=365, inicio="2024-01-01", banners=12, skus=200, sesgo=1.1, semilla=0, tamano_bloque=1_000_000):
+    """Genera las filas en bloques (DataFrames) ordenados por fecha."""
+    tabla_banners, tabla_skus = catalogo(banners, skus, semilla)
+    rng = np.random.default_rng([semilla, 1])
+    peso_banner = _zipf(banners, sesgo, rng)
+    peso_sku = _zipf(skus, sesgo, rng)
+
+    # Repartir las filas entre los días según el día de la semana y una tendencia suave
+    fechas = pd.date_range(pd.Timestamp(inicio), periods=dias, freq="D")
+    peso_dia = np.asarray(PESO_DIA_SEMANA)[fechas.dayofweek] * np.linspace(1.0, 1.2, dias)
+    filas_por_dia = rng.multinomial(filas, peso_dia / peso_dia.sum())
+
+    categorias_banner = pd.CategoricalDtype(tabla_banners['Banner'])
+    categorias_sku = pd.CategoricalDtype(tabla_skus['Código Homologado'])
+    precios = tabla_skus['precio'].to_numpy()
+    unidades = tabla_skus['unidades'].to_numpy()
+
+    bloque, acumuladas = [], 0
+    for dia, (fecha, cantidad) in enumerate(zip(fechas, filas_por_dia)):
+        rng_dia = np.random.default_rng([semilla, 2, dia])
+        banner = rng_dia.choice(banners, cantidad, p=peso_banner)
+        sku = rng_dia.choice(skus, cantidad, p=peso_sku)
+        bloque.append(pd.DataFrame({
+            'Date': np.full(cantidad, fecha.to_datetime64()),
+            'Banner': pd.Categorical.from_codes(banner, dtype=categorias_banner),
+            'Código Homologado': pd.Categorical.from_codes(sku, dtype=categorias_sku),
+            'Cantidad Vendida Actual': (rng_dia.poisson(unidades[sku]) + 1).astype('int32'),
+            # Variación de precio por tienda y promoción, alrededor del precio base
+            'Precio': np.round(precios[sku] * rng_dia.uniform(0.9, 1.1, cantidad), -1),
+        }))
+        acumuladas += cantidad
+        if acumuladas >= tamano_bloque:
+            yield pd.concat(bloque, ignore_index=True)
+            bloque, acumuladas = [], 0
+    if bloque:
+        yield pd.concat(bloque, ignore_index=True)
+
+
+def escribir(ruta, filas, **opciones):
+    """Escribe ``filas`` sintéticas en ``ruta`` (.xlsx, .parquet o .arrow/.feather)."""
+    extension = os.path.splitext(ruta)[1].lower()
+    if extension == ".xlsx":
+        if filas > MAX_FILAS_EXCEL:
+            logger.warning("Excel admite %d filas; se escriben sólo esas", MAX_FILAS_EXCEL)
+            filas = MAX_FILAS_EXCEL
+        df = pd.concat(generar(filas, **opciones), ignore_index=True)
+        df.to_excel(ruta, sheet_name=HOJA, index=False)
+        return filas
+
+    if extension not in (".parquet", ".arrow", ".feather"):
+        raise ValueError(f"Formato no soportado: '{extension}'")
+    destino = escritor = None
+    try:
+        for bloque in generar(filas, **opciones):
+            tabla = pa.Table.from_pandas(bloque[list(COLUMNAS)], preserve_index=False)
+            if escritor is None:
+                if extension == ".parquet":
+                    escritor = pq.ParquetWriter(ruta, tabla.schema)
+                else:
+                    destino = pa.OSFile(ruta, "wb")
+                    escritor = pa.ipc.new_file(destino, tabla.schema)
+            escritor.write_table(tabla)
+    finally:
+        if escritor is not None:
+            escritor.close()
+        if destino is not None:
+            destino.close()
+    return filas
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Genera ventas sintéticas con el esquema de 'Análisis PAC'.")
+    parser.add_argument("filas", type=int)
+    parser.add_argument("rutas", nargs="+", help="archivos de salida (.xlsx, .parquet, .arrow)")
+    parser.add_argument("--dias", type=int, default=365)
+    parser.add_argument("--inicio", default="2024-01-01")
+    parser.add_argument("--banners", type=int, default=12)
+    parser.add_argument("--skus", type=int, default=200)
+    parser.add_argument("--sesgo", type=float, default=1.1, help="exponente de Zipf de banners y productos")
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args(argumentos)
+
+    logging.basicConfig(level=logging.INFO)
+    opciones = dict(dias=args.dias, inicio=args.inicio, banners=args.banners, skus=args.skus, sesgo=args.sesgo, semilla=args.semilla)
+    for ruta in args.rutas:
+        escritas = escribir(ruta, args.filas, **opciones)
+        logger.info("%s: %d filas", ruta, escritas)
+
+
+if __name__ == "__main__":
+    main()
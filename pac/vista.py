@@ -0,0 +1,66 @@
+"""Presentación en Streamlit del resultado de una actividad comercial."""
+import plotly.graph_objs as go # type: ignore
+import streamlit as st # type: ignore
+
+from pac.instrumentacion import fase, medida
+
+
+@medida("render")
+def mostrar_campana(campana, resultado):
+    vista = campana.vista
+    kpis = resultado.kpis
+    utilidad_df = resultado.utilidad_df
+    decimales = vista.get("decimales", 2)
+    periodo_base = vista.get("periodo_base", "Periodo Anterior")
+    periodo_actividad = vista.get("periodo_actividad", "Actividad")
+
+    # Interfaz en Streamlit
+    st.title(campana.nombre)
+
+    # Dividir en dos columnas para los KPIs
+    col1, col2 = st.columns(2)
+
+    # Columna 1: Ventas en unidades y su crecimiento
+    with col1:
+        st.metric(vista.get("unidades_base", "Ventas Totales Periodo Anterior"), f"{kpis['unidades_base']:,.0f}")
+        st.metric(vista.get("unidades_actividad", "Ventas Totales Durante la Actividad"), f"{kpis['unidades_actividad']:,.0f}")
+        st.metric("Crecimiento Bruto en Unidades", f"{kpis['crecimiento_unidades']:,.0f}")
+        st.metric("Crecimiento Bruto en Unidades (%)", f"{kpis['crecimiento_unidades_pct']:.2f}%")
+
+    # Columna 2: Descuento, inscripción y crecimiento monetario
+    with col2:
+        if campana.tiene_descuento:
+            st.metric(vista.get("descuento", "Total Descuento"), f"${kpis['total_descuento']:,.{decimales}f}")
+        if campana.valor_inscripcion:
+            st.metric("Crecimiento Real Monetario", f"${kpis['crecimiento_monetario']:,.{decimales}f}")
+            st.metric("Valor Inscripción", f"${kpis['valor_inscripcion']:,.{decimales}f}")
+        st.metric(vista.get("crecimiento", "Crecimiento Monetario Total"), f"${kpis['crecimiento_monetario_total']:,.{decimales}f}")
+
+    # Mostrar tabla de utilidad
+    st.subheader("Análisis de Utilidad por Producto")
+    st.dataframe(utilidad_df)
+
+    # Graficar comparativo de ventas monetarias
+    with fase("grafico"):
+        st.subheader(vista.get("grafico", "Comparativo de Ventas Monetarias"))
+        productos = utilidad_df[utilidad_df['Producto'] != 'Total']
+        fig = go.Figure()
+        fig.add_trace(go.Bar(
+            y=productos['Producto'],
+            x=productos[f'Ventas Monetarias {periodo_actividad}'],
+            name=periodo_actividad,
+            orientation='h'
+        ))
+        fig.add_trace(go.Bar(
+            y=productos['Producto'],
+            x=productos[f'Ventas Monetarias {periodo_base}'],
+            name=periodo_base,
+            orientation='h'
+        ))
+        fig.update_layout(
+            title="Comparativo de Ventas Monetarias",
+            xaxis_title="Ventas Monetarias",
+            barmode='group',
+            yaxis=dict(autorange="reversed")
+        )
+        st.plotly_chart(fig)
@@ -0,0 +1,16 @@
+from benchmarks.paginas import fases_exclusivas
+
+
+def test_fases_exclusivas_descuenta_las_anidadas():
+    registro = {"fases": [
+        {"fase": "carga", "nivel": 0, "inicio": 0.0, "duracion": 1.0},
+        {"fase": "lectura", "nivel": 1, "inicio": 0.1, "duracion": 0.5},
+        {"fase": "cubo", "nivel": 1, "inicio": 0.6, "duracion": 0.3},
+        {"fase": "render", "nivel": 0, "inicio": 1.0, "duracion": 0.2},
+        {"fase": "grafico", "nivel": 1, "inicio": 1.0, "duracion": 0.15},
+    ]}
+    tiempos = fases_exclusivas([registro, registro])
+    esperado = {"carga": 0.4, "lectura": 1.0, "cubo": 0.6, "render": 0.1, "grafico": 0.3}
+    assert tiempos.keys() == esperado.keys()
+    for fase, segundos in esperado.items():
+        assert abs(tiempos[fase] - segundos) < 1e-9
@@ -0,0 +1,36 @@
+import pandas as pd # type: ignore
+
+from pac.calendario import festivos_colombia, resolver
+from pac.campanas import crear_campana
+
+
+def test_festivos_2024_y_2025():
+    assert list(festivos_colombia(2024)) == list(pd.to_datetime([
+        "2024-01-01", "2024-01-08", "2024-03-25", "2024-03-28", "2024-03-29", "2024-05-01",
+        "2024-05-13", "2024-06-03", "2024-06-10", "2024-07-01", "2024-07-20", "2024-08-07",
+        "2024-08-19", "2024-10-14", "2024-11-04", "2024-11-11", "2024-12-08", "2024-12-25",
+    ]))
+    # En 2025 San Pedro y el Sagrado Corazón caen el mismo lunes 30 de junio
+    assert list(festivos_colombia(2025)) == list(pd.to_datetime([
+        "2025-01-01", "2025-01-06", "2025-03-24", "2025-04-17", "2025-04-18", "2025-05-01",
+        "2025-06-02", "2025-06-23", "2025-06-30", "2025-07-20", "2025-08-07", "2025-08-18",
+        "2025-10-13", "2025-11-03", "2025-11-17", "2025-12-08", "2025-12-25",
+    ]))
+
+
+def test_resolver_regla():
+    lunes = resolver("2024-10-01", "2024-11-30", dias_semana=["Lunes"], festivos="solo")
+    assert list(lunes) == list(pd.to_datetime(["2024-10-14", "2024-11-04", "2024-11-11"]))
+
+
+def test_periodo_con_regla_y_base_corrida():
+    campana = crear_campana("regla", {
+        "nombre": "Regla",
+        "banners": ["A"],
+        "niveles": [{"descuento": 0.1, "productos": ["X"]}],
+        "actividad": {"inicio": "2024-10-01", "fin": "2024-11-30", "dias_semana": ["lunes"],
+                      "meses": [11], "festivos": "excluir"},
+        "base": {"semanas_antes": 1},
+    })
+    assert list(campana.actividad.dias()) == list(pd.to_datetime(["2024-11-18", "2024-11-25"]))
+    assert list(campana.base.dias()) == list(pd.to_datetime(["2024-11-11", "2024-11-18"]))
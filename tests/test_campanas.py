@@ -0,0 +1,40 @@
+import pandas as pd # type: ignore
+
+from pac.campanas import crear_campana, evaluar_campanas
+from pac.indice import IndiceAcumulado
+
+
+def _ventas():
+    # Una venta por día y banner, todas del mismo producto
+    return pd.DataFrame({
+        'Date': pd.to_datetime(["2024-09-24", "2024-10-01", "2024-10-01", "2024-10-02"]),
+        'Banner': ["A", "A", "B", "A"],
+        'Código Homologado': ["X", "X", "X", "X"],
+        'Cantidad Vendida Actual': [1, 1, 1, 1],
+        'Precio': [100.0, 100.0, 100.0, 100.0],
+    })
+
+
+def _campana(actividad, banners):
+    return crear_campana("prueba", {
+        "nombre": "Prueba",
+        "banners": banners,
+        "niveles": [{"descuento": 0.1, "productos": ["X"]}],
+        "actividad": actividad,
+        "base": {"semanas_antes": 1},
+    })
+
+
+def test_lista_y_rango_suman_igual_con_valores_repetidos():
+    ventas = _ventas()
+    por_lista = _campana({"fechas": ["2024-10-01", "2024-10-01"]}, ["A", "A "])
+    por_rango = _campana({"inicio": "2024-10-01", "fin": "2024-10-01"}, ["A", "A "])
+
+    lista = evaluar_campanas(ventas, [por_lista])["prueba"].kpis
+    rango = evaluar_campanas(ventas, [por_rango], indice=IndiceAcumulado(ventas))["prueba"].kpis
+    rango_sin_indice = evaluar_campanas(ventas, [por_rango])["prueba"].kpis
+
+    for kpis in (lista, rango, rango_sin_indice):
+        assert kpis["unidades_actividad"] == 1
+        assert kpis["unidades_base"] == 1
+        assert kpis["total_descuento"] == 10
@@ -0,0 +1,36 @@
+import pandas as pd # type: ignore
+
+from pac.datos import _actualizar_cubo, _hashes_por_dia, _limpiar, construir_cubo
+
+
+def _filas(registros):
+    # Filas ya limpias y ordenadas por fecha, como las deja la carga
+    crudo = pd.DataFrame(registros, columns=['Date', 'Banner', 'Código Homologado', 'Cantidad Vendida Actual', 'Precio'])
+    df, _ = _limpiar(crudo.sort_values('Date', kind='stable', ignore_index=True))
+    return df
+
+
+def test_actualizar_cubo_igual_a_reconstruirlo():
+    antes = _filas([
+        ("2024-10-01", "Éxito", "p1", 1, 100.0),
+        ("2024-10-01", "Carulla", "P2", 2, 50.0),
+        ("2024-10-02", "Éxito", "P1", 3, 100.0),
+        ("2024-10-03", "Carulla", "P1", 1, 90.0),
+        ("2024-10-03", "Éxito", "P2", 4, 50.0),
+    ])
+    despues = _filas([
+        ("2024-10-01", "Éxito", "P1", 1, 100.0),
+        ("2024-10-01", "Carulla", "P2", 2, 50.0),
+        # Día cambiado, con un producto y un banner nuevos
+        ("2024-10-02", "Éxito", "P1", 5, 100.0),
+        ("2024-10-02", "Olímpica", "P3", 2, 70.0),
+        # El 3 de octubre desaparece y se agrega el 4
+        ("2024-10-04", "Carulla", "P3", 1, 70.0),
+    ])
+
+    dias_antes, dias_despues = _hashes_por_dia(antes), _hashes_por_dia(despues)
+    cambiados = {dia for dia in set(dias_antes) | set(dias_despues) if dias_antes.get(dia) != dias_despues.get(dia)}
+    assert cambiados == {"2024-10-02", "2024-10-03", "2024-10-04"}
+
+    actualizado = _actualizar_cubo(construir_cubo(antes), despues, cambiados)
+    pd.testing.assert_frame_equal(actualizado, construir_cubo(despues))
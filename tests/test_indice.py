@@ -0,0 +1,76 @@
+import numpy as np # type: ignore
+import pandas as pd # type: ignore
+
+from pac.indice import IndiceAcumulado, IndiceFechas
+
+
+def _ventas():
+    # Ventas ordenadas por fecha del 1 al 10 de enero, sin ventas el 5
+    rng = np.random.default_rng(0)
+    dias = pd.to_datetime([d for d in pd.date_range("2024-01-01", "2024-01-10") if d.day != 5])
+    fechas = np.sort(rng.choice(dias, 300))
+    return pd.DataFrame({
+        'Date': fechas,
+        'Banner': pd.Categorical(rng.choice(["A", "B", "C"], 300)),
+        'Código Homologado': pd.Categorical(rng.choice(["P1", "P2", "P3", "P4"], 300)),
+        'Cantidad Vendida Actual': rng.integers(1, 5, 300),
+        'Precio': rng.choice([10.0, 25.5, 40.0], 300),
+    })
+
+
+def _sumar_con_pandas(df, inicio, fin, banners, productos):
+    filas = df[df['Date'].between(inicio, fin) & df['Banner'].isin(banners) & df['Código Homologado'].isin(productos)]
+    return pd.DataFrame({
+        'unidades': filas['Cantidad Vendida Actual'].to_numpy(),
+        'bruto': (filas['Cantidad Vendida Actual'] * filas['Precio']).to_numpy(),
+    }, index=pd.Index(list(filas['Código Homologado']), dtype=object)).groupby(level=0).sum()
+
+
+def test_indice_acumulado_igual_a_filtrar():
+    df = _ventas()
+    indice = IndiceAcumulado(df)
+    ventanas = [
+        ("2024-01-01", "2024-01-01"),  # primer día
+        ("2024-01-10", "2024-01-10"),  # último día
+        ("2024-01-01", "2024-01-10"),
+        ("2024-01-03", "2024-01-07"),
+        ("2024-01-05", "2024-01-05"),  # día sin ventas
+        ("2023-12-20", "2024-01-02"),  # empieza antes de los datos
+        ("2024-01-09", "2024-02-01"),  # termina después
+        ("2023-12-01", "2023-12-31"),  # todo antes
+        ("2024-02-01", "2024-02-10"),  # todo después
+        ("2024-01-06", "2024-01-04"),  # fin antes del inicio
+    ]
+    for inicio, fin in ventanas:
+        for banners, productos in ((["A", "B", "C"], ["P1", "P2", "P3", "P4"]), (["B"], ["P2", "P4", "P9"])):
+            obtenido = indice.sumar(inicio, fin, banners, productos)
+            # El índice devuelve en cero los productos sin ventas en la ventana
+            obtenido = obtenido[(obtenido['unidades'] != 0) | (obtenido['bruto'] != 0)]
+            obtenido.index = pd.Index(list(obtenido.index), dtype=object)
+            esperado = _sumar_con_pandas(df, pd.Timestamp(inicio), pd.Timestamp(fin), banners, productos)
+            pd.testing.assert_frame_equal(obtenido, esperado, check_dtype=False, check_names=False)
+
+
+def test_indice_fechas_bordes():
+    df = _ventas()
+    indice = IndiceFechas(df['Date'])
+    for fechas in (["2024-01-01"], ["2024-01-10"], ["2024-01-05"], ["2023-12-31", "2024-01-11"], []):
+        mascara = df['Date'].isin(pd.to_datetime(fechas))
+        np.testing.assert_array_equal(indice.filas(fechas), np.flatnonzero(mascara))
+    assert indice.rangos(["2024-01-01"]) == [(0, int((df['Date'] == "2024-01-01").sum()))]
+    assert indice.rangos(["2024-01-10"])[-1][1] == len(df)
+    assert indice.rangos(["2024-02-01"]) == []
+
+
+def test_indice_fechas_lista_igual_a_mascara():
+    df = _ventas()
+    indice = IndiceFechas(df['Date'])
+    # Desordenada, con repetidas, días seguidos y sueltos, días sin ventas y vacías
+    fechas = pd.to_datetime(["2024-01-08", "2024-01-02", "2024-01-03", "2024-01-02", "2024-01-05",
+                             "2024-01-04", "2024-01-06", "2024-01-20", None])
+    mascara = df['Date'].isin(fechas.dropna())
+    np.testing.assert_array_equal(indice.filas(fechas), np.flatnonzero(mascara))
+    # Del 2 al 6 de enero hay ventas todos los días salvo el 5, que no parte el corte
+    assert len(indice.rangos(fechas)) == 2
+    for inicio, fin in indice.rangos(fechas):
+        assert mascara.iloc[inicio:fin].all()
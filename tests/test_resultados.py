@@ -0,0 +1,66 @@
+import os
+
+import pandas as pd # type: ignore
+
+from pac.campanas import crear_campana
+from pac.resultados import VERSIONES_POR_CAMPANA, Resultado, resultados_persistentes
+
+
+def _campana(descuento=0.1):
+    return crear_campana("prueba", {
+        "nombre": "Prueba",
+        "banners": ["A"],
+        "niveles": [{"descuento": descuento, "productos": ["X"]}],
+        "actividad": {"inicio": "2024-10-01", "fin": "2024-10-07"},
+        "base": {"semanas_antes": 1},
+    })
+
+
+class _Evaluador:
+    def __init__(self):
+        self.llamadas = 0
+
+    def __call__(self, campanas):
+        self.llamadas += 1
+        return {
+            campana.identificador: Resultado(
+                kpis={"total_descuento": 10.0 * self.llamadas},
+                utilidad_df=pd.DataFrame({"Código Homologado": ["X"], "Utilidad": [1.5]}),
+            )
+            for campana in campanas
+        }
+
+
+def _versiones(directorio):
+    return {nombre.split("__")[1] for nombre in os.listdir(directorio) if nombre.endswith(".arrow")}
+
+
+def test_reutiliza_lo_guardado(tmp_path):
+    evaluar = _Evaluador()
+    campana = _campana()
+    primero = resultados_persistentes([campana], "v1", evaluar, directorio=str(tmp_path))["prueba"]
+    segundo = resultados_persistentes([campana], "v1", evaluar, directorio=str(tmp_path))["prueba"]
+    assert evaluar.llamadas == 1
+    assert segundo.kpis == primero.kpis
+    pd.testing.assert_frame_equal(segundo.utilidad_df, primero.utilidad_df)
+
+
+def test_otra_version_u_otra_definicion_es_otra_clave(tmp_path):
+    evaluar = _Evaluador()
+    resultados_persistentes([_campana()], "v1", evaluar, directorio=str(tmp_path))
+    resultados_persistentes([_campana()], "v2", evaluar, directorio=str(tmp_path))
+    assert evaluar.llamadas == 2
+    # Cambiar un descuento del TOML cambia la huella de la actividad
+    cambiada = _campana(descuento=0.2)
+    assert cambiada.huella != _campana().huella
+    resultados_persistentes([cambiada], "v2", evaluar, directorio=str(tmp_path))
+    assert evaluar.llamadas == 3
+
+
+def test_conserva_las_ultimas_versiones(tmp_path):
+    evaluar = _Evaluador()
+    for numero in range(VERSIONES_POR_CAMPANA + 2):
+        resultados_persistentes([_campana()], f"v{numero}", evaluar, directorio=str(tmp_path))
+    assert _versiones(tmp_path) == {f"v{numero}" for numero in range(2, VERSIONES_POR_CAMPANA + 2)}
+    # Tampoco quedan bloqueos de las versiones borradas
+    assert not [nombre for nombre in os.listdir(tmp_path) if nombre.split("__")[1] in ("v0", "v1")]
@@ -0,0 +1,24 @@
+import time
+
+import pandas as pd # type: ignore
+
+from pac.sintetico import SKUS_BASE, catalogo, generar
+
+
+def test_generar_no_depende_del_tamano_de_bloque():
+    # Misma semilla: mismas filas, sin importar cómo se partan los bloques
+    grande = pd.concat(generar(5000, dias=20, semilla=3), ignore_index=True)
+    chico = pd.concat(generar(5000, dias=20, semilla=3, tamano_bloque=700), ignore_index=True)
+    pd.testing.assert_frame_equal(grande, chico)
+    assert len(grande) == 5000
+
+
+def test_catalogo_grande_termina_con_codigos_unicos():
+    # Más productos de los que admite el patrón de códigos sintéticos
+    inicio = time.perf_counter()
+    _, productos = catalogo(skus=450_000)
+    assert time.perf_counter() - inicio < 60
+    codigos = productos['Código Homologado']
+    assert len(codigos) == 450_000
+    assert codigos.is_unique
+    assert list(codigos[:len(SKUS_BASE)]) == list(SKUS_BASE)